@@ -0,0 +1,95 @@
+"""Add employer message hash to auto-reply history.
+
+Existing rows that repeat a (negotiation, message) pair would break the new
+unique index. The earliest row per pair keeps the real hash; later ones are
+kept but marked with a per-row "dup:<id>" value instead of being deleted, so
+no history is lost and downgrade simply drops the column again.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+
+import hashlib
+import logging
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger(f"alembic.{__name__}")
+
+
+def _message_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column(
+        "auto_reply_history",
+        sa.Column("employer_message_hash", sa.String(32), nullable=True),
+    )
+
+    # Backfill hashes for existing rows
+    history = sa.table(
+        "auto_reply_history",
+        sa.column("id", sa.Integer()),
+        sa.column("negotiation_id", sa.String(255)),
+        sa.column("employer_message", sa.Text()),
+        sa.column("employer_message_hash", sa.String(32)),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(
+            history.c.id, history.c.negotiation_id, history.c.employer_message
+        ).order_by(history.c.id)
+    ).all()
+
+    # The earliest reply per (negotiation, message) pair keeps the real hash;
+    # later duplicates get a unique marker so the index can be created
+    seen: set[tuple[str, str]] = set()
+    duplicates = 0
+    for row_id, negotiation_id, employer_message in rows:
+        message_hash = _message_hash(employer_message)
+        if (negotiation_id, message_hash) in seen:
+            message_hash = f"dup:{row_id}"
+            duplicates += 1
+        else:
+            seen.add((negotiation_id, message_hash))
+        bind.execute(
+            history.update()
+            .where(history.c.id == row_id)
+            .values(employer_message_hash=message_hash)
+        )
+
+    if duplicates:
+        logger.warning(
+            "Marked %d duplicate auto_reply_history rows with dup:<id> hashes",
+            duplicates,
+        )
+
+    with op.batch_alter_table("auto_reply_history") as batch_op:
+        batch_op.alter_column(
+            "employer_message_hash", existing_type=sa.String(32), nullable=False
+        )
+
+    op.create_index(
+        "uq_auto_reply_history_negotiation_message",
+        "auto_reply_history",
+        ["negotiation_id", "employer_message_hash"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "uq_auto_reply_history_negotiation_message", table_name="auto_reply_history"
+    )
+    with op.batch_alter_table("auto_reply_history") as batch_op:
+        batch_op.drop_column("employer_message_hash")
@@ -0,0 +1,54 @@
+"""Add active days bitmask to auto-reply settings.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def upgrade() -> None:
+    op.add_column(
+        "auto_reply_settings",
+        sa.Column(
+            "active_days_mask",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("127"),
+        ),
+    )
+
+    # Backfill masks from the existing comma-separated day lists
+    settings = sa.table(
+        "auto_reply_settings",
+        sa.column("id", sa.Integer()),
+        sa.column("active_days", sa.String(50)),
+        sa.column("active_days_mask", sa.Integer()),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(settings.c.id, settings.c.active_days)).all()
+    for row_id, active_days in rows:
+        days = {day.strip() for day in active_days.lower().split(",")}
+        mask = sum(1 << i for i, day in enumerate(_WEEKDAYS) if day in days)
+        bind.execute(
+            settings.update()
+            .where(settings.c.id == row_id)
+            .values(active_days_mask=mask)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("auto_reply_settings") as batch_op:
+        batch_op.drop_column("active_days_mask")
@@ -14,10 +14,25 @@ class Settings(BaseSettings):
     hh_client_secret: str
     hh_redirect_uri: str
 
+    hh_http2: bool = Field(
+        default=True,
+        description="Multiplex HH API calls over HTTP/2 (requires h2)",
+    )
+
     # LLM Configuration (Ollama)
     llm_provider: Literal["ollama"] = "ollama"
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "qwen3:14b"
+    llm_max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum in-flight LLM requests per provider",
+    )
+    llm_max_retries: int = Field(
+        default=2,
+        ge=0,
+        description="SDK retries on connection errors, 429 and 5xx responses",
+    )
 
     # Database
     database_url: AnyUrl
@@ -1,8 +1,9 @@
 """ApplyBot - Automated job application system for hh.ru."""
 
+import asyncio
 import logging
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,6 +16,8 @@ from app.routers import apply_router, auth_router, hh_apply
 from app.routers.auto_reply import router as auto_reply_router
 from app.routers.scheduler import router as scheduler_router
 from app.services.auto_reply_service import auto_reply_service
+from app.services.hh_client import HHClient, create_http_client
+from app.services.llm.factory import create_llm_http_client, get_llm_provider
 from app.services.scheduler_service import scheduler_service
 
 log_level = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -31,6 +34,11 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Initializing application...")
     await TokenStorage.init_models()
+    http_client = create_http_client()
+    app.state.hh_client = HHClient(http_client)
+    llm_http_client = create_llm_http_client()
+    app.state.llm_provider = get_llm_provider(llm_http_client)
+    token_refresher = asyncio.create_task(app.state.hh_client.run_token_refresher())
 
     if settings.scheduler_enabled:
         logger.info("Starting scheduler...")
@@ -38,7 +46,7 @@ async def lifespan(app: FastAPI):
         logger.info("Scheduler started")
 
         logger.info("Starting auto-reply scheduler...")
-        await auto_reply_service.start()
+        await auto_reply_service.start(app.state.hh_client, app.state.llm_provider)
         logger.info("Auto-reply scheduler started")
 
     logger.info("Application initialized")
@@ -48,6 +56,12 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     await scheduler_service.stop()
     await auto_reply_service.stop()
+    token_refresher.cancel()
+    # Let the refresher unwind before its client is closed
+    with suppress(asyncio.CancelledError):
+        await token_refresher
+    await http_client.aclose()
+    await llm_http_client.aclose()
     logger.info("Shutdown complete")
 
 
@@ -2,7 +2,7 @@
 
 from datetime import UTC, datetime
 
-from sqlalchemy import JSON, Boolean, DateTime, Integer, String, Text
+from sqlalchemy import JSON, Boolean, DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.storage import Base
@@ -99,6 +99,10 @@ class AutoReplySettings(Base):
     active_days: Mapped[str] = mapped_column(
         String(50), default="mon,tue,wed,thu,fri,sat,sun", nullable=False
     )
+    # Bitmask of active_days (bit 0 = Monday), kept in sync on update
+    active_days_mask: Mapped[int] = mapped_column(
+        Integer, default=0b1111111, nullable=False
+    )
 
     # Reply settings
     auto_send: Mapped[bool] = mapped_column(
@@ -122,6 +126,14 @@ class AutoReplyHistory(Base):
     """Model for tracking auto-reply history."""
 
     __tablename__ = "auto_reply_history"
+    __table_args__ = (
+        Index(
+            "uq_auto_reply_history_negotiation_message",
+            "negotiation_id",
+            "employer_message_hash",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -130,6 +142,8 @@ class AutoReplyHistory(Base):
 
     # Message details
     employer_message: Mapped[str] = mapped_column(Text, nullable=False)
+    # blake2b-128 hex digest of employer_message, used as the dedup key
+    employer_message_hash: Mapped[str] = mapped_column(String(32), nullable=False)
     generated_reply: Mapped[str] = mapped_column(Text, nullable=False)
     was_sent: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
@@ -4,14 +4,14 @@ import logging
 import secrets
 
 import httpx
-from fastapi import APIRouter, Cookie, HTTPException, Response
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Response
 from fastapi.responses import JSONResponse, RedirectResponse
 from starlette.requests import Request
 
 from app.core.config import settings
 from app.core.redis_client import OAuthStateStore
 from app.core.storage import TokenStorage
-from app.services.hh_client import HHClient
+from app.services.hh_client import HHClient, get_hh_client
 
 logger = logging.getLogger(__name__)
 
@@ -36,12 +36,16 @@ async def login(request: Request):
 
 
 @router.get("/callback")
-async def callback(code: str, state: str, response: Response):
+async def callback(
+    code: str,
+    state: str,
+    response: Response,
+    hh: HHClient = Depends(get_hh_client),
+):
     """Handle OAuth callback from HH.ru."""
     if not await OAuthStateStore.exists(state):
         raise HTTPException(status_code=400, detail="Invalid OAuth state")
 
-    hh = HHClient()
     token_data = await hh.get_access_token(code)
 
     saved_token = await TokenStorage.save(
@@ -53,6 +57,8 @@ async def callback(code: str, state: str, response: Response):
         }
     )
 
+    # Replace any token cached from a previous login
+    hh.cache_token(saved_token)
     await OAuthStateStore.delete(state)
 
     redirect_response = RedirectResponse(url="/")
@@ -79,11 +85,11 @@ async def callback(code: str, state: str, response: Response):
 async def auth_status(
     request: Request,
     hh_access_token: str | None = Cookie(None),
+    hh: HHClient = Depends(get_hh_client),
 ):
     """Check user authentication status."""
     if hh_access_token:
         try:
-            hh = HHClient()
             user_info = await hh.get_user_info(hh_access_token)
             return JSONResponse(
                 status_code=200,
@@ -701,46 +701,52 @@ class ApplicationService:
         use_cover_letter setting. The LLM is used for both cover letters
         and screening question answers.
         """
-        result = {"cover_letter": None, "answers": None}
         user_profile = await self._build_user_profile(request)
 
-        # Generate cover letter if enabled
-        if use_cover_letter:
-            cover_letter = await self.llm_provider.generate_cover_letter(
-                vacancy, user_profile
-            )
-            result["cover_letter"] = cover_letter
-        else:
-            logger.info(
-                f"Skipping cover letter generation for vacancy {vacancy.get('id')}"
-            )
+        async def _cover_letter() -> str | None:
+            if not use_cover_letter:
+                logger.info(
+                    f"Skipping cover letter generation for vacancy {vacancy.get('id')}"
+                )
+                return None
+            return await self.llm_provider.generate_cover_letter(vacancy, user_profile)
+
+        async def _answers() -> list[dict] | None:
+            # Always try to answer screening questions (they can be required)
+            questions = await self.hh_client.get_vacancy_questions(vacancy["id"])
+            if not questions:
+                return None
 
-        # Always try to answer screening questions (they can be required)
-        questions = await self.hh_client.get_vacancy_questions(vacancy["id"])
-        if questions:
             # Filter out questions with external links
             answerable_questions = self._filter_answerable_questions(questions)
-
-            if answerable_questions:
-                logger.info(
-                    f"Vacancy {vacancy.get('id')} has {len(answerable_questions)} "
-                    f"answerable screening questions (total: {len(questions)})"
-                )
-                answers = await self.llm_provider.answer_screening_questions(
-                    answerable_questions, vacancy, user_profile
-                )
-                if answers:
-                    logger.info(
-                        f"Generated {len(answers)} answers for screening questions"
-                    )
-                    result["answers"] = answers
-            elif len(questions) > 0:
+            if not answerable_questions:
                 logger.info(
                     f"Vacancy {vacancy.get('id')}: all {len(questions)} questions "
                     "have external links, skipping"
                 )
+                return None
 
-        return result
+            logger.info(
+                f"Vacancy {vacancy.get('id')} has {len(answerable_questions)} "
+                f"answerable screening questions (total: {len(questions)})"
+            )
+            answers = await self.llm_provider.answer_screening_questions(
+                answerable_questions, vacancy, user_profile
+            )
+            if answers:
+                logger.info(f"Generated {len(answers)} answers for screening questions")
+            return answers or None
+
+        # The cover letter and the answers are independent LLM calls
+        cover_letter, answers = await asyncio.gather(
+            _cover_letter(), _answers(), return_exceptions=True
+        )
+        # Surface the first failure only once both have settled
+        for outcome in (cover_letter, answers):
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        return {"cover_letter": cover_letter, "answers": answers}
 
     def _filter_answerable_questions(self, questions: list[dict]) -> list[dict]:
         """Filter out questions that require external resources.
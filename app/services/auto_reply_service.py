@@ -1,30 +1,87 @@
 """Auto-reply service for handling recruiter messages."""
 
 import asyncio
+import hashlib
 import logging
-from datetime import UTC, datetime
-from zoneinfo import ZoneInfo
+import random
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import httpx
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from sqlalchemy import select, update
+from fastapi import HTTPException
+from sqlalchemy import Row, func, select, update
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
 from app.core.storage import async_session
 from app.models.scheduler import AutoReplyHistory, AutoReplySettings
-from app.services.hh_client import HHClient
-from app.services.llm.factory import get_llm_provider
+from app.services.hh_client import HHAPIError, HHClient
+from app.services.llm.base import LLMProvider
+from app.services.llm.factory import create_llm_http_client, get_llm_provider
 
 logger = logging.getLogger(__name__)
 
+# Weekday abbreviations indexed by datetime.weekday()
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Master tick interval; per-user intervals are checked against last_check_at
+_TICK_JOB_ID = "auto_reply_tick"
+_TICK_INTERVAL_MINUTES = 1
+
+# Backoff after rate limiting or upstream failures: base * 2**failures, capped
+_BACKOFF_BASE_SECONDS = 60
+_BACKOFF_MAX_SECONDS = 3600
+
+# Upper bound on users checked concurrently within a single tick
+_USER_CHECK_CONCURRENCY = 4
+
+# Upper bound on concurrent negotiation message fetches
+_MESSAGE_FETCH_CONCURRENCY = 8
+
+# Russian prompt for recruiter message reply
+_REPLY_PROMPT_TEMPLATE = """Ты помогаешь соискателю отвечать на сообщения рекрутеров на hh.ru.
+
+ВАКАНСИЯ: {vacancy_title} в {company}
+
+ИСТОРИЯ ПЕРЕПИСКИ:
+{conversation_text}
+
+ПОСЛЕДНЕЕ СООБЩЕНИЕ РЕКРУТЕРА:
+{employer_message}
+
+ИНСТРУКЦИИ:
+1. Напиши профессиональный и вежливый ответ
+2. Ответ должен быть кратким (2-4 предложения)
+3. Покажи заинтересованность в вакансии
+4. Если рекрутер задает вопрос - ответь на него
+5. Если приглашают на собеседование - подтверди готовность
+6. Используй "Добрый день!" в начале, если уместно
+7. НЕ добавляй подпись с именем или контактами
+8. Пиши ТОЛЬКО текст ответа, без пояснений
+
+Ответ:"""
+
 
 def _now() -> datetime:
     """Get current time as UTC naive datetime for DB storage."""
     return datetime.now(UTC).replace(tzinfo=None)
 
 
+def _active_days_mask(active_days: str) -> int:
+    """Convert a comma-separated weekday list into a bitmask (bit 0 = Monday)."""
+    days = {day.strip() for day in active_days.lower().split(",")}
+    return sum(1 << i for i, day in enumerate(_WEEKDAYS) if day in days)
+
+
+def _message_hash(text: str) -> str:
+    """Get a compact dedup key for an employer message."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
 class AutoReplyService:
     """Service for automatically replying to recruiter messages."""
 
@@ -41,20 +98,54 @@ class AutoReplyService:
             return
         self._initialized = True
         self._scheduler: AsyncIOScheduler | None = None
-        self._running_checks: dict[str, bool] = {}
-
-    async def start(self):
-        """Start the auto-reply scheduler."""
+        self._user_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._pending: set[asyncio.Task] = set()
+        self._last_started: dict[str, datetime] = {}
+        self._failures: dict[str, int] = {}
+        self._backoff_until: dict[str, datetime] = {}
+        self._enabled_users = 0
+        # App-wide clients, set by start(); checks run on the app's loop
+        self._hh_client: HHClient | None = None
+        self._llm_provider: LLMProvider | None = None
+
+    async def start(
+        self,
+        hh_client: HHClient | None = None,
+        llm_provider: LLMProvider | None = None,
+    ):
+        """Start the auto-reply scheduler.
+
+        Args:
+            hh_client: Shared HH client; a per-check client is used if omitted
+            llm_provider: Shared LLM provider; a per-check one is used if omitted
+        """
+        self._hh_client = hh_client
+        self._llm_provider = llm_provider
         if self._scheduler is not None and self._scheduler.running:
             logger.info("Auto-reply scheduler already running")
             return
 
         self._scheduler = AsyncIOScheduler(timezone=settings.scheduler_default_timezone)
+        self._scheduler.add_job(
+            self._tick,
+            trigger=IntervalTrigger(minutes=_TICK_INTERVAL_MINUTES),
+            id=_TICK_JOB_ID,
+            replace_existing=True,
+            coalesce=True,  # Run only once if multiple ticks were missed
+            max_instances=1,
+        )
         self._scheduler.start()
-        logger.info("Auto-reply scheduler started")
 
-        # Load all enabled user jobs
-        await self._load_all_user_jobs()
+        # get_status() reports this before the first tick refreshes it
+        async with async_session() as session:
+            self._enabled_users = await session.scalar(
+                select(func.count())
+                .select_from(AutoReplySettings)
+                .where(AutoReplySettings.enabled)
+            )
+        logger.info(
+            f"Auto-reply scheduler started ({self._enabled_users} users enabled)"
+        )
 
     async def stop(self):
         """Stop the auto-reply scheduler."""
@@ -63,73 +154,83 @@ class AutoReplyService:
             self._scheduler = None
             logger.info("Auto-reply scheduler stopped")
 
-    async def _load_all_user_jobs(self):
-        """Load and schedule all enabled auto-reply jobs."""
-        async with async_session() as session:
-            query = select(AutoReplySettings).where(AutoReplySettings.enabled)
-            result = await session.execute(query)
-            user_settings = result.scalars().all()
+        # Let manually triggered checks finish before shutdown
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
 
-            for user_settings_item in user_settings:
-                await self._schedule_user_job(user_settings_item)
-                logger.info(
-                    f"Loaded auto-reply job for user {user_settings_item.user_id}"
-                )
+        # The shared clients are closed by their owner
+        self._hh_client = None
+        self._llm_provider = None
 
-    async def _schedule_user_job(self, user_settings: AutoReplySettings):
-        """Schedule auto-reply check for a user."""
-        if self._scheduler is None:
-            return
-
-        job_id = f"auto_reply_{user_settings.user_id}"
-
-        # Remove existing job if any
-        existing_job = self._scheduler.get_job(job_id)
-        if existing_job:
-            self._scheduler.remove_job(job_id)
+    async def _tick(self):
+        """Run checks for every enabled user whose interval has elapsed."""
+        async with async_session() as session:
+            query = select(
+                AutoReplySettings.user_id,
+                AutoReplySettings.check_interval_minutes,
+                AutoReplySettings.last_check_at,
+            ).where(AutoReplySettings.enabled)
+            result = await session.execute(query)
+            rows = result.all()
+
+        self._enabled_users = len(rows)
+        now = _now()
+        due = []
+        for user_id, interval_minutes, last_check_at in rows:
+            backoff_until = self._backoff_until.get(user_id)
+            if backoff_until is not None and backoff_until > now:
+                continue
+            # Failed or skipped checks don't update last_check_at, so also
+            # honour the last start time to avoid retrying on every tick.
+            last_run = max(
+                filter(None, (last_check_at, self._last_started.get(user_id))),
+                default=None,
+            )
+            if (
+                last_run is None
+                or last_run + timedelta(minutes=interval_minutes) <= now
+            ):
+                due.append(user_id)
 
-        if not user_settings.enabled:
+        if not due:
             return
 
-        # Schedule with interval trigger
-        trigger = IntervalTrigger(
-            minutes=user_settings.check_interval_minutes,
-            timezone=user_settings.timezone,
-        )
+        semaphore = asyncio.Semaphore(_USER_CHECK_CONCURRENCY)
 
-        self._scheduler.add_job(
-            self._run_auto_reply_check,
-            trigger=trigger,
-            id=job_id,
-            args=[user_settings.user_id],
-            replace_existing=True,
-            misfire_grace_time=7200,  # 2 hours - handle sleep/suspend periods
-            coalesce=True,  # Run only once if multiple runs were missed
-        )
+        async def _check(user_id: str):
+            async with semaphore:
+                await self._run_auto_reply_check(user_id)
 
-        next_run = self._scheduler.get_job(job_id).next_run_time
-        logger.info(
-            f"Scheduled auto-reply for user {user_settings.user_id} "
-            f"every {user_settings.check_interval_minutes} min, next run: {next_run}"
-        )
+        await asyncio.gather(*(_check(user_id) for user_id in due))
 
     async def _run_auto_reply_check(self, user_id: str):
         """Execute auto-reply check for a user."""
-        if self._running_checks.get(user_id):
+        lock = self._user_locks[user_id]
+        if lock.locked():
             logger.warning(f"Auto-reply check already running for user {user_id}")
             return
 
-        self._running_checks[user_id] = True
+        async with lock:
+            self._last_started[user_id] = _now()
+            await self._do_auto_reply_check(user_id)
 
+    async def _do_auto_reply_check(self, user_id: str):
+        """Run a single auto-reply check; caller holds the user's lock."""
         try:
             logger.info(f"Starting auto-reply check for user {user_id}")
 
             async with async_session() as session:
-                query = select(AutoReplySettings).where(
-                    AutoReplySettings.user_id == user_id
-                )
+                # Load only the columns the check needs
+                query = select(
+                    AutoReplySettings.enabled,
+                    AutoReplySettings.timezone,
+                    AutoReplySettings.active_days_mask,
+                    AutoReplySettings.active_hours_start,
+                    AutoReplySettings.active_hours_end,
+                    AutoReplySettings.auto_send,
+                ).where(AutoReplySettings.user_id == user_id)
                 result = await session.execute(query)
-                user_settings = result.scalar_one_or_none()
+                user_settings = result.one_or_none()
 
                 if not user_settings or not user_settings.enabled:
                     logger.info(f"Auto-reply disabled for user {user_id}")
@@ -166,36 +267,61 @@ class AutoReplyService:
                 f"Auto-reply check completed for {user_id}: "
                 f"processed={processed}, replied={replied}"
             )
-
+            self._failures.pop(user_id, None)
+            self._backoff_until.pop(user_id, None)
+
+        except HHAPIError as e:
+            if e.status_code == 429 or e.status_code >= 500:
+                delay = self._schedule_backoff(user_id)
+                logger.warning(
+                    f"HH API error {e.status_code} during auto-reply check for "
+                    f"{user_id}, backing off for {delay:.0f}s: {e}"
+                )
+            else:
+                logger.error(f"HH API error during auto-reply check for {user_id}: {e}")
         except httpx.RequestError as e:
-            logger.error(f"Network error during auto-reply check for {user_id}: {e}")
+            delay = self._schedule_backoff(user_id)
+            logger.error(
+                f"Network error during auto-reply check for {user_id}, "
+                f"backing off for {delay:.0f}s: {e}"
+            )
+        except HTTPException as e:
+            # Raised by HHClient when no valid token is stored for the user
+            delay = self._schedule_backoff(user_id)
+            logger.error(
+                f"Auto-reply check for {user_id} failed ({e.status_code}: "
+                f"{e.detail}), backing off for {delay:.0f}s"
+            )
         except SQLAlchemyError as e:
             logger.error(f"Database error during auto-reply check for {user_id}: {e}")
         except ValueError as e:
             logger.error(f"Validation error during auto-reply check for {user_id}: {e}")
-        finally:
-            self._running_checks[user_id] = False
+        except Exception:
+            # Last resort (e.g. a malformed HH payload): keep the tick's other
+            # checks running and don't retry this user on every tick
+            delay = self._schedule_backoff(user_id)
+            logger.exception(
+                f"Unexpected error during auto-reply check for {user_id}, "
+                f"backing off for {delay:.0f}s"
+            )
+
+    def _schedule_backoff(self, user_id: str) -> float:
+        """Push the user's next check out with exponential backoff and jitter."""
+        failures = self._failures.get(user_id, 0)
+        self._failures[user_id] = failures + 1
+        delay = min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * (1 << failures))
+        delay = random.uniform(delay / 2, delay)
+        self._backoff_until[user_id] = _now() + timedelta(seconds=delay)
+        return delay
 
-    def _is_active_time(self, settings: AutoReplySettings) -> bool:
+    def _is_active_time(self, settings: AutoReplySettings | Row) -> bool:
         """Check if current time is within active hours."""
         try:
             tz = ZoneInfo(settings.timezone)
             now = datetime.now(tz)
 
             # Check day of week
-            day_map = {
-                0: "mon",
-                1: "tue",
-                2: "wed",
-                3: "thu",
-                4: "fri",
-                5: "sat",
-                6: "sun",
-            }
-            current_day = day_map[now.weekday()]
-            active_days = settings.active_days.lower().split(",")
-
-            if current_day not in active_days:
+            if not (settings.active_days_mask >> now.weekday()) & 1:
                 return False
 
             # Check hour
@@ -205,7 +331,7 @@ class AutoReplyService:
                 return False
 
             return True
-        except Exception as e:
+        except (ZoneInfoNotFoundError, ValueError) as e:
             logger.warning(f"Error checking active time: {e}")
             return True  # Default to active if check fails
 
@@ -217,100 +343,123 @@ class AutoReplyService:
         Returns:
             Tuple of (processed_count, replied_count)
         """
-        hh_client = HHClient()
-        llm_provider = get_llm_provider()
+        async with AsyncExitStack() as stack:
+            hh_client = self._hh_client
+            if hh_client is None:
+                hh_client = await stack.enter_async_context(HHClient())
+            llm_provider = self._llm_provider
+            if llm_provider is None:
+                llm_client = await stack.enter_async_context(create_llm_http_client())
+                llm_provider = get_llm_provider(llm_client)
+            return await self._reply_to_unread(
+                hh_client, llm_provider, user_id, auto_send
+            )
+
+    async def _reply_to_unread(
+        self,
+        hh_client: HHClient,
+        llm_provider: LLMProvider,
+        user_id: str,
+        auto_send: bool,
+    ) -> tuple[int, int]:
+        """Reply to the latest unanswered employer message in each negotiation."""
         processed = 0
         replied = 0
 
-        try:
-            # Get negotiations with unread messages
-            negotiations = await hh_client.get_negotiations_with_unread()
-
-            for negotiation in negotiations:
-                negotiation_id = str(negotiation.get("id", ""))
-                if not negotiation_id:
-                    continue
-
-                # Get messages for this negotiation
-                messages = await hh_client.get_negotiation_messages(negotiation_id)
-                if not messages:
-                    continue
-
-                # Find the last message from employer (not from us)
-                last_employer_message = None
-                for msg in reversed(messages):
-                    # Check if message is from employer
-                    author = msg.get("author", {})
-                    if author.get("participant_type") == "employer":
-                        last_employer_message = msg
-                        break
-
-                if not last_employer_message:
-                    continue
-
-                # Check if we've already replied to this message
-                message_text = last_employer_message.get("text", "")
-                if await self._already_replied(negotiation_id, message_text):
-                    continue
-
-                processed += 1
-
-                # Get vacancy info for context
-                vacancy = negotiation.get("vacancy", {})
-                employer = vacancy.get("employer", {})
-
-                # Generate reply using LLM
-                reply = await self._generate_reply(
-                    llm_provider,
-                    message_text,
-                    vacancy,
-                    messages,
-                )
-
-                if not reply:
-                    continue
+        # Get negotiations with unread messages
+        negotiations = await hh_client.get_negotiations_with_unread()
+
+        # Fetch messages for all negotiations concurrently; the
+        # per-negotiation endpoints are independent of each other.
+        semaphore = asyncio.Semaphore(_MESSAGE_FETCH_CONCURRENCY)
+
+        async def _fetch(negotiation_id: str) -> list[dict]:
+            async with semaphore:
+                return await hh_client.get_negotiation_messages(negotiation_id)
+
+        pending = [
+            (negotiation, negotiation_id)
+            for negotiation in negotiations
+            if (negotiation_id := str(negotiation.get("id", "")))
+        ]
+        fetched = await asyncio.gather(*(_fetch(nid) for _, nid in pending))
+
+        for (negotiation, negotiation_id), messages in zip(
+            pending, fetched, strict=True
+        ):
+            if not messages:
+                continue
+
+            # Find the last message from employer (not from us)
+            last_employer_message = None
+            for msg in reversed(messages):
+                # Check if message is from employer
+                author = msg.get("author", {})
+                if author.get("participant_type") == "employer":
+                    last_employer_message = msg
+                    break
+
+            if not last_employer_message:
+                continue
+
+            # Check if we've already replied to this message
+            message_text = last_employer_message.get("text", "")
+            message_hash = _message_hash(message_text)
+            if await self._already_replied(negotiation_id, message_hash):
+                continue
+
+            processed += 1
+
+            # Get vacancy info for context
+            vacancy = negotiation.get("vacancy", {})
+            employer = vacancy.get("employer", {})
+
+            # Generate reply using LLM
+            reply = await self._generate_reply(
+                llm_provider,
+                message_text,
+                vacancy,
+                messages,
+            )
 
-                # Save to history
-                await self._save_reply_history(
-                    user_id=user_id,
-                    negotiation_id=negotiation_id,
-                    vacancy_id=str(vacancy.get("id", "")),
-                    employer_message=message_text,
-                    generated_reply=reply,
-                    was_sent=auto_send,
-                    employer_name=employer.get("name"),
-                    vacancy_title=vacancy.get("name"),
-                )
+            if not reply:
+                continue
+
+            # Save to history
+            await self._save_reply_history(
+                user_id=user_id,
+                negotiation_id=negotiation_id,
+                vacancy_id=str(vacancy.get("id", "")),
+                employer_message=message_text,
+                employer_message_hash=message_hash,
+                generated_reply=reply,
+                was_sent=auto_send,
+                employer_name=employer.get("name"),
+                vacancy_title=vacancy.get("name"),
+            )
 
-                # Send if auto_send is enabled
-                if auto_send:
-                    result = await hh_client.send_negotiation_message(
-                        negotiation_id, reply
+            # Send if auto_send is enabled
+            if auto_send:
+                result = await hh_client.send_negotiation_message(negotiation_id, reply)
+                if result:
+                    replied += 1
+                    logger.info(
+                        f"Auto-replied to negotiation {negotiation_id}: "
+                        f"{vacancy.get('name')}"
                     )
-                    if result:
-                        replied += 1
-                        logger.info(
-                            f"Auto-replied to negotiation {negotiation_id}: "
-                            f"{vacancy.get('name')}"
-                        )
-
-                # Small delay between processing
-                await asyncio.sleep(2)
 
-        except Exception as e:
-            logger.error(f"Error processing unread messages: {e}")
+            # Small delay between processing
+            await asyncio.sleep(2)
 
         return processed, replied
 
-    async def _already_replied(
-        self, negotiation_id: str, employer_message: str
-    ) -> bool:
+    async def _already_replied(self, negotiation_id: str, message_hash: str) -> bool:
         """Check if we've already replied to this specific message."""
         try:
             async with async_session() as session:
-                query = select(AutoReplyHistory).where(
+                query = select(AutoReplyHistory.id).where(
                     AutoReplyHistory.negotiation_id == negotiation_id,
-                    AutoReplyHistory.employer_message == employer_message,
+                    AutoReplyHistory.employer_message_hash == message_hash,
                 )
                 result = await session.execute(query)
                 return result.scalar_one_or_none() is not None
@@ -326,47 +475,34 @@ class AutoReplyService:
     ) -> str | None:
         """Generate a reply using LLM."""
         try:
-            # Build conversation context
-            conversation_text = ""
-            for msg in conversation_history[-5:]:  # Last 5 messages for context
-                author = msg.get("author", {})
-                participant_type = author.get("participant_type", "unknown")
-                text = msg.get("text", "")
-                if participant_type == "employer":
-                    conversation_text += f"Рекрутер: {text}\n"
-                else:
-                    conversation_text += f"Я: {text}\n"
+            # Build conversation context from the last 5 messages
+            conversation_text = "\n".join(
+                (
+                    "Рекрутер: "
+                    if msg.get("author", {}).get("participant_type") == "employer"
+                    else "Я: "
+                )
+                + (msg.get("text") or "")
+                for msg in conversation_history[-5:]
+            )
 
             vacancy_title = vacancy.get("name", "Вакансия")
             company = vacancy.get("employer", {}).get("name", "Компания")
 
-            # Russian prompt for recruiter message reply
-            prompt = f"""Ты помогаешь соискателю отвечать на сообщения рекрутеров на hh.ru.
-
-ВАКАНСИЯ: {vacancy_title} в {company}
-
-ИСТОРИЯ ПЕРЕПИСКИ:
-{conversation_text}
-
-ПОСЛЕДНЕЕ СООБЩЕНИЕ РЕКРУТЕРА:
-{employer_message}
-
-ИНСТРУКЦИИ:
-1. Напиши профессиональный и вежливый ответ
-2. Ответ должен быть кратким (2-4 предложения)
-3. Покажи заинтересованность в вакансии
-4. Если рекрутер задает вопрос - ответь на него
-5. Если приглашают на собеседование - подтверди готовность
-6. Используй "Добрый день!" в начале, если уместно
-7. НЕ добавляй подпись с именем или контактами
-8. Пиши ТОЛЬКО текст ответа, без пояснений
-
-Ответ:"""
+            prompt = _REPLY_PROMPT_TEMPLATE.format_map(
+                {
+                    "vacancy_title": vacancy_title,
+                    "company": company,
+                    "conversation_text": conversation_text,
+                    "employer_message": employer_message,
+                }
+            )
 
             response = await llm_provider.generate(prompt)
             return response.strip() if response else None
 
-        except Exception as e:
+        except ValueError as e:
+            # Providers wrap timeouts and API errors in ValueError
             logger.error(f"Error generating reply: {e}")
             return None
 
@@ -376,6 +512,7 @@ class AutoReplyService:
         negotiation_id: str,
         vacancy_id: str,
         employer_message: str,
+        employer_message_hash: str,
         generated_reply: str,
         was_sent: bool,
         employer_name: str | None,
@@ -389,6 +526,7 @@ class AutoReplyService:
                     negotiation_id=negotiation_id,
                     vacancy_id=vacancy_id,
                     employer_message=employer_message,
+                    employer_message_hash=employer_message_hash,
                     generated_reply=generated_reply,
                     was_sent=was_sent,
                     employer_name=employer_name,
@@ -410,6 +548,9 @@ class AutoReplyService:
             result = await session.execute(query)
             user_settings = result.scalar_one_or_none()
 
+            if kwargs.get("active_days") is not None:
+                kwargs["active_days_mask"] = _active_days_mask(kwargs["active_days"])
+
             if user_settings:
                 # Update existing
                 for key, value in kwargs.items():
@@ -429,8 +570,8 @@ class AutoReplyService:
             await session.commit()
             await session.refresh(user_settings)
 
-            # Update scheduler
-            await self._schedule_user_job(user_settings)
+            # Picked up by the next master tick; no per-user job to reschedule
+            self._last_started.pop(user_id, None)
 
             return user_settings
 
@@ -459,11 +600,15 @@ class AutoReplyService:
 
     async def trigger_manual_check(self, user_id: str) -> dict:
         """Trigger a manual auto-reply check."""
-        if self._running_checks.get(user_id):
+        if self._user_locks[user_id].locked():
             return {"status": "error", "message": "Check already running"}
 
-        # Run in background
-        asyncio.create_task(self._run_auto_reply_check(user_id))
+        # Run in background; keep a reference so the task isn't GC'd mid-run
+        task = asyncio.create_task(
+            self._run_auto_reply_check(user_id), name=f"auto-reply-{user_id}"
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
         return {"status": "started", "message": "Auto-reply check started"}
 
     def get_status(self) -> dict:
@@ -471,10 +616,9 @@ class AutoReplyService:
         if self._scheduler is None:
             return {"scheduler_running": False, "jobs_count": 0}
 
-        jobs = self._scheduler.get_jobs()
         return {
             "scheduler_running": self._scheduler.running,
-            "jobs_count": len(jobs),
+            "jobs_count": self._enabled_users,
         }
 
 
@@ -2,14 +2,21 @@ import asyncio
 import json
 import logging
 import random
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
 from datetime import UTC, datetime, timedelta
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import httpx
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
 from app.core.storage import TokenStorage
+from app.models.token import Token
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +68,269 @@ def get_random_headers() -> dict[str, str]:
     }
 
 
+def _now() -> datetime:
+    """Get current time as UTC naive datetime, matching token storage."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class _TTLCache:
+    """Bounded LRU mapping whose entries expire after a fixed TTL."""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return a cached value, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop a single entry if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._data.clear()
+
+
+class _TokenBucket:
+    """Token bucket rate limiter allowing short bursts up to ``capacity``.
+
+    Callers reserve a token up front and sleep off any deficit. There is no
+    await between reading and updating the state, so no lock is needed.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
+
+
+# Methods that are safe to resend after an ambiguous failure
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Server responses worth retrying with backoff
+_RETRYABLE_STATUSES = frozenset({408, 500, 502, 503, 504})
+
+
+# DDoS-Guard challenge pages come back as 403/503, or as HTML where the API
+# would answer with JSON
+_DDOS_STATUSES = frozenset({403, 429, 503})
+_DDOS_MARKERS_RE = re.compile(rb"ddos-guard|checking your browser", re.IGNORECASE)
+_DDOS_SCAN_BYTES = 4096
+
+
+def _is_ddos_challenge(response: httpx.Response) -> bool:
+    """Detect a DDoS-Guard challenge without decoding the whole body."""
+    content_type = response.headers.get("content-type", "").lower()
+    # API errors are relayed through the DDoS-Guard edge too, so a JSON body is
+    # a real answer whatever the server header says
+    if "application/json" in content_type:
+        return False
+    is_html = content_type.startswith("text/html")
+    if response.status_code not in _DDOS_STATUSES and not is_html:
+        return False
+    if "ddos-guard" in response.headers.get("server", "").lower():
+        return True
+    return _DDOS_MARKERS_RE.search(response.content, 0, _DDOS_SCAN_BYTES) is not None
+
+
+# Longer error bodies (e.g. HTML challenge pages) add nothing to logs
+_ERROR_SNIPPET_BYTES = 512
+
+
+def _body_snippet(body: bytes) -> str:
+    """Decode a bounded prefix of a response body for logs and errors."""
+    return body[:_ERROR_SNIPPET_BYTES].decode("utf-8", errors="replace")
+
+
+def _error_body(response: httpx.Response) -> dict:
+    """Decode an HH error response, falling back to a text snippet.
+
+    Only decoding errors are caught, so cancellation always propagates.
+    """
+    try:
+        return response.json()
+    except ValueError:  # JSONDecodeError or an undecodable body
+        return {"message": _body_snippet(response.content)}
+
+
+def _parse_json_body(response: httpx.Response) -> Any:
+    """Parse a successful HH response body."""
+    # Parse straight from the raw bytes; decoding the body to str first
+    # would copy large vacancy lists for no benefit
+    body = response.content
+    if not body or body.isspace():
+        return {
+            "status": "success",
+            "status_code": response.status_code,
+        }
+
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        if response.status_code in [200, 201, 204]:
+            return {
+                "status": "success",
+                "status_code": response.status_code,
+            }
+        snippet = _body_snippet(body)
+        logger.error("Failed to parse JSON response: %s, Response text: %s", e, snippet)
+        raise HHAPIError(
+            500,
+            f"Invalid JSON response: {e!s}",
+            {"response_text": snippet},
+        )
+
+
+def _safe_get(data: Any, *keys: str, default: Any = None) -> Any:
+    """Safely get nested values from a dictionary."""
+    result = data
+    for key in keys:
+        if not isinstance(result, dict):
+            return default
+        result = result.get(key)
+    return result if result is not None else default
+
+
+_BACKOFF_MAX_SECONDS = 30.0
+_RETRY_AFTER_MAX_SECONDS = 120.0
+_DDOS_BACKOFF_BASE_SECONDS = 90.0
+_DDOS_BACKOFF_MAX_SECONDS = 600.0
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given as seconds or as an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+def _backoff_delay(
+    base_delay: float, attempt: int, max_delay: float = _BACKOFF_MAX_SECONDS
+) -> float:
+    """Full-jitter exponential backoff capped at ``max_delay``.
+
+    The window doubles per attempt (base, 2*base, 4*base, ...) and the delay
+    is drawn uniformly from it, so clients retrying together spread out.
+    """
+    cap = min(base_delay * (1 << min(attempt - 1, 6)), max_delay)
+    return random.uniform(0, cap)
+
+
+def _retry_delay(response: httpx.Response, base_delay: float, attempt: int) -> float:
+    """Honour a server's Retry-After (clamped), else fall back to backoff."""
+    delay = _parse_retry_after(response.headers.get("Retry-After"))
+    if delay is None:
+        return _backoff_delay(base_delay, attempt)
+    if delay > _RETRY_AFTER_MAX_SECONDS:
+        logger.warning(
+            "Retry-After of %.0fs on %s %s clamped to %.0fs",
+            delay,
+            response.request.method,
+            response.request.url.path,
+            _RETRY_AFTER_MAX_SECONDS,
+        )
+        return _RETRY_AFTER_MAX_SECONDS
+    return delay
+
+
+# Vacancies change slowly; areas and specializations are effectively static.
+# Shared across HHClient instances; failed requests are never cached.
+_vacancy_cache = _TTLCache(ttl=600, maxsize=2048)
+_reference_cache = _TTLCache(ttl=24 * 3600, maxsize=8)
+# Last ETag and body per reference endpoint, kept past the TTL for revalidation
+_reference_etags: dict[str, tuple[str, Any]] = {}
+
+# Latest token row and its time.monotonic() deadline, shared so a fresh
+# HHClient (e.g. in a scheduler job) skips the storage read
+_token_cache: dict[str, Any] = {"token": None, "expires_at": 0.0}
+
+# HH allows 1000 requests per minute per application, across all clients
+_MAX_REQUESTS_PER_MINUTE = 1000
+_REQUEST_BURST = 20
+_request_bucket = _TokenBucket(
+    rate=_MAX_REQUESTS_PER_MINUTE / 60, capacity=_REQUEST_BURST
+)
+
+
+# Browser headers that don't depend on the User-Agent, set once on the pool.
+# Accept-Encoding is left to httpx so only decodable codings are advertised.
+_STATIC_HEADERS = {
+    "HH-User-Agent": "ApplyBot/1.0 (i.tkachenko@zohomail.eu)",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+    "DNT": "1",
+    "Connection": "keep-alive",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site",
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Upgrade-Insecure-Requests": "1",
+    "Origin": "https://hh.ru",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+}
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP/2 client used for all HH traffic.
+
+    Token endpoints on hh.ru are reached with absolute URLs through the same
+    client, so one pool serves both hosts.
+    """
+    return httpx.AsyncClient(
+        base_url=HHClient.API_BASE,
+        http2=settings.hh_http2,
+        headers=_STATIC_HEADERS,
+        timeout=httpx.Timeout(10.0, read=30.0),
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=20,
+            keepalive_expiry=60.0,
+        ),
+        cookies=httpx.Cookies(),  # Enable cookie persistence for DDoS-guard
+        follow_redirects=True,
+    )
+
+
 class HHAPIError(Exception):
     """HH API error."""
 
@@ -79,57 +349,53 @@ class HHClient:
     TOKEN_URL = "https://hh.ru/oauth/token"
     API_BASE = "https://api.hh.ru"
 
-    MAX_REQUESTS_PER_MINUTE = 1000
-    REQUEST_DELAY = 0.1
+    TOKEN_REFRESH_MARGIN = 600  # Refresh tokens 10 minutes before expiry
+    NEGOTIATION_PAGE_CONCURRENCY = 5
+    MAX_NEGOTIATION_PAGES = 20
     POST_REQUEST_DELAY = 2.0  # Reduced delay for speed
 
-    def __init__(self):
-        self.client = httpx.AsyncClient(
-            base_url=self.API_BASE,
-            timeout=httpx.Timeout(30.0),
-            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
-            cookies=httpx.Cookies(),  # Enable cookie persistence for DDoS-guard
-            follow_redirects=True,
-        )
+    # User-facing reasons for failed applications, by HH status code
+    _APPLY_ERROR_MESSAGES = {
+        400: "Invalid application data or already applied to this vacancy",
+        403: "Access denied - you may not be eligible for this vacancy",
+        404: "Vacancy or resume not found",
+        409: "Application already exists for this vacancy",
+    }
+
+    def __init__(self, http_client: httpx.AsyncClient | None = None):
+        # A client passed in is shared (e.g. app-wide) and closed by its owner
+        self._owns_client = http_client is None
+        self.client = http_client or create_http_client()
         self._token = None
-        self._token_expires_at = None
-        self._last_request_time = None
+        self._token_row: Token | None = None
+        self._auth_header: str | None = None
+        self._token_expires_at = 0.0  # time.monotonic() deadline
+        self._token_lock = asyncio.Lock()  # Shared instance: serialize refreshes
+        self._rejected_refresh_token: str | None = None  # Dead until re-auth
         self._last_post_time = None  # Track POST requests separately
         self._cookies_initialized = (
             False  # Track if we've initialized cookies from hh.ru
         )
         self._user_agent = random.choice(USER_AGENTS)  # Select one UA for the session
+        self._base_headers = self._build_base_headers()
 
-    def _get_headers(self) -> dict[str, str]:
-        """Generate realistic browser headers with consistent UA."""
-        referer = random.choice(REFERERS)
-
+    def _build_base_headers(self) -> dict[str, str]:
+        """Build the browser headers derived from this client's UA."""
         # Extract Chrome version from User-Agent for consistency
         chrome_version = "120" if "120" in self._user_agent else "119"
 
         return {
             "User-Agent": self._user_agent,
-            "HH-User-Agent": "ApplyBot/1.0 (i.tkachenko@zohomail.eu)",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Accept-Encoding": "gzip, deflate, br",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-site",
             "Sec-Ch-Ua": f'"Not_A Brand";v="8", "Chromium";v="{chrome_version}", "Google Chrome";v="{chrome_version}"',
-            "Sec-Ch-Ua-Mobile": "?0",
             "Sec-Ch-Ua-Platform": '"macOS"'
             if "Macintosh" in self._user_agent
             else '"Windows"',
-            "Upgrade-Insecure-Requests": "1",
-            "Referer": referer,
-            "Origin": "https://hh.ru",
-            "Cache-Control": "no-cache",
-            "Pragma": "no-cache",
         }
 
+    def _get_headers(self) -> dict[str, str]:
+        """Generate realistic browser headers with consistent UA."""
+        return {**self._base_headers, "Referer": random.choice(REFERERS)}
+
     async def __aenter__(self):
         return self
 
@@ -138,25 +404,19 @@ class HHClient:
 
     async def _rate_limit(self, method: str = "GET"):
         """Rate limiting with special handling for POST requests."""
-        current_time = asyncio.get_event_loop().time()
-
         # For POST requests, enforce longer delay
         if method == "POST" and self._last_post_time:
-            elapsed = current_time - self._last_post_time
+            elapsed = time.monotonic() - self._last_post_time
             if elapsed < self.POST_REQUEST_DELAY:
                 delay = self.POST_REQUEST_DELAY - elapsed
-                logger.info(f"Rate limiting POST request: waiting {delay:.2f}s")
+                logger.info("Rate limiting POST request: waiting %.2fs", delay)
                 await asyncio.sleep(delay)
 
         # General rate limiting for all requests
-        if self._last_request_time:
-            elapsed = current_time - self._last_request_time
-            if elapsed < self.REQUEST_DELAY:
-                await asyncio.sleep(self.REQUEST_DELAY - elapsed)
+        await _request_bucket.acquire()
 
-        self._last_request_time = asyncio.get_event_loop().time()
         if method == "POST":
-            self._last_post_time = self._last_request_time
+            self._last_post_time = time.monotonic()
 
     async def _initialize_cookies(self):
         """Initialize cookies by visiting hh.ru main page to get DDoS-guard cookies."""
@@ -164,134 +424,217 @@ class HHClient:
             return
 
         try:
-            # Create a temporary client to visit hh.ru main page
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(30.0),
-                follow_redirects=True,
-                cookies=httpx.Cookies(),
-            ) as temp_client:
-                headers = self._get_headers()
-                headers.update(
-                    {
-                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                        "Sec-Fetch-Dest": "document",
-                        "Sec-Fetch-Mode": "navigate",
-                        "Sec-Fetch-Site": "none",
-                        "Sec-Fetch-User": "?1",
-                    }
-                )
+            headers = self._get_headers()
+            headers.update(
+                {
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+                    "Sec-Fetch-Dest": "document",
+                    "Sec-Fetch-Mode": "navigate",
+                    "Sec-Fetch-Site": "none",
+                    "Sec-Fetch-User": "?1",
+                }
+            )
 
-                logger.info("Initializing cookies from hh.ru main page...")
-                await temp_client.get("https://hh.ru/", headers=headers)
-
-                # Copy cookies from temp client to main client
-                # httpx.Cookies iteration returns cookie names, so we use .jar to get actual Cookie objects
-                for cookie in temp_client.cookies.jar:
-                    self.client.cookies.set(
-                        name=cookie.name,
-                        value=cookie.value,
-                        domain=cookie.domain,
-                        path=cookie.path,
-                    )
+            # Cookies land in the shared client's jar
+            logger.info("Initializing cookies from hh.ru main page...")
+            await self.client.get("https://hh.ru/", headers=headers, timeout=30.0)
 
             self._cookies_initialized = True
             logger.info(
-                f"Cookies initialized. Total cookies: {len(self.client.cookies)}"
+                "Cookies initialized. Total cookies: %s", len(self.client.cookies)
             )
 
             # Wait a bit after getting cookies to mimic human behavior
             await asyncio.sleep(random.uniform(2.0, 5.0))
 
         except httpx.TimeoutException as e:
-            logger.warning(f"Timeout initializing cookies from hh.ru: {e}")
+            logger.warning("Timeout initializing cookies from hh.ru: %s", e)
         except httpx.RequestError as e:
-            logger.warning(f"Network error initializing cookies: {e}")
+            logger.warning("Network error initializing cookies: %s", e)
 
     async def _ensure_token(self):
         """Ensure we have a valid access token."""
-        if (
-            self._token
-            and self._token_expires_at
-            and datetime.now(UTC).replace(tzinfo=None) < self._token_expires_at
-        ):
+        if self._token_is_fresh():
             return
 
+        async with self._token_lock:
+            # Another request may have refreshed the token while we waited
+            if self._token_is_fresh():
+                return
+
+            cached = _token_cache["token"]
+            if cached is not None and time.monotonic() < _token_cache["expires_at"]:
+                self._use_token(cached, _token_cache["expires_at"])
+                return
+
+            token = await TokenStorage.get_latest()
+            if not token or token.is_expired():
+                raise HTTPException(
+                    status_code=401,
+                    detail="No valid HH.ru token available. Please re-authenticate via /auth/login",
+                )
+
+            self.cache_token(token)
+            logger.info("HH token refreshed successfully")
+
+    def cache_token(self, token: Token) -> None:
+        """Cache a token row and its expiry for this and future clients."""
+        # Convert the wall-clock expiry into a monotonic deadline once so
+        # the fast path is a float comparison immune to clock jumps
+        expires_at = token.obtained_at + timedelta(seconds=token.expires_in - 300)
+        remaining = (expires_at - _now()).total_seconds()
+        deadline = time.monotonic() + remaining
+        _token_cache["token"] = token
+        _token_cache["expires_at"] = deadline
+        self._use_token(token, deadline)
+
+    def _use_token(self, token: Token, deadline: float) -> None:
+        """Point this client at a token valid until ``deadline``."""
+        self._token_row = token
+        self._token_expires_at = deadline
+        if self._token != token.access_token:
+            self._token = token.access_token
+            self._auth_header = f"Bearer {self._token}"
+
+    async def refresh_stored_token(self) -> Token | None:
+        """Refresh the stored token via OAuth if it is close to expiring.
+
+        Returns:
+            The current token row, or None if no token is stored.
+        """
+        # Always re-read: the user may have re-authenticated since the cache
         token = await TokenStorage.get_latest()
-        if not token or token.is_expired():
-            raise HTTPException(
-                status_code=401,
-                detail="No valid HH.ru token available. Please re-authenticate via /auth/login",
-            )
+        if token is None:
+            return None
+        if not token.is_expired(buffer_seconds=self.TOKEN_REFRESH_MARGIN):
+            self.cache_token(token)
+            return token
+        if token.refresh_token == self._rejected_refresh_token:
+            # Retrying won't help; wait for the user to re-authenticate
+            return token
 
-        self._token = token.access_token
-        self._token_expires_at = token.obtained_at + timedelta(
-            seconds=token.expires_in - 300
+        try:
+            token_data = await self.refresh_token(token.refresh_token)
+        except HTTPException as e:
+            if e.status_code < 500:
+                self._rejected_refresh_token = token.refresh_token
+                logger.error(
+                    "HH rejected the stored refresh token; re-authenticate via "
+                    "/auth/login to resume token refreshes"
+                )
+            raise
+        token = await TokenStorage.save(
+            {
+                "access_token": token_data["access_token"],
+                "refresh_token": token_data["refresh_token"],
+                "expires_in": token_data["expires_in"],
+                "obtained_at": token_data["obtained_at"],
+            }
         )
-        self.client.headers.update({"Authorization": f"Bearer {self._token}"})
-        logger.info("HH token refreshed successfully")
+        self.cache_token(token)
+        logger.info("HH token refreshed proactively")
+        return token
+
+    async def run_token_refresher(self) -> None:
+        """Keep the stored token fresh so requests never block on token I/O.
+
+        Intended to run as a background task for the application lifetime.
+        """
+        failures = 0
+        while True:
+            delay = 60.0
+            try:
+                token = await self.refresh_stored_token()
+                failures = 0
+                if token is not None:
+                    # Wake up just before the refresh margin is reached
+                    refresh_at = token.obtained_at + timedelta(
+                        seconds=token.expires_in - self.TOKEN_REFRESH_MARGIN
+                    )
+                    delay = max(delay, (refresh_at - _now()).total_seconds())
+            except HTTPException as e:
+                # A rejected refresh token is skipped from now on, so only
+                # transient failures are worth backing off from
+                if e.status_code >= 500:
+                    failures += 1
+                    delay += _backoff_delay(delay, failures, 3600.0)
+                logger.warning("Background token refresh failed: %s", e.detail)
+            except (httpx.RequestError, SQLAlchemyError, OSError) as e:
+                failures += 1
+                delay += _backoff_delay(delay, failures, 3600.0)
+                logger.warning("Background token refresh failed: %s", e)
+            await asyncio.sleep(min(delay, 3600.0))
+
+    def _token_is_fresh(self) -> bool:
+        """Check whether the cached token is set and not about to expire."""
+        return self._token is not None and time.monotonic() < self._token_expires_at
 
     async def _make_request(
         self,
         method: str,
         endpoint: str,
         max_retries: int = 3,
-        base_delay: float = 1.0,
+        base_delay: float = 0.5,
         **kwargs,
     ) -> dict:
-        """Make HTTP request with retry logic."""
+        """Make HTTP request with retry logic and return the parsed body."""
+        response = await self._send_request(
+            method, endpoint, max_retries=max_retries, base_delay=base_delay, **kwargs
+        )
+        return _parse_json_body(response)
+
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send HTTP request with retry logic and return the raw response."""
         # Initialize cookies on first request
         await self._initialize_cookies()
+        await self._ensure_token()
 
-        # Use consistent headers for each request
-        default_headers = self._get_headers()
-        request_headers = kwargs.get("headers", {})
-        # Merge: request-specific headers override defaults
-        merged_headers = {**default_headers, **request_headers}
-        kwargs["headers"] = merged_headers
-
-        # Add random jitter before request to mimic human behavior
-        jitter = random.uniform(0.5, 1.5)
-        await asyncio.sleep(jitter)
+        # Use consistent headers for each request. Authorization is sent per
+        # request rather than stored on the shared client's headers.
+        headers = self._get_headers()
+        if self._auth_header is not None:
+            headers["Authorization"] = self._auth_header
+        # Request-specific headers override defaults
+        if "headers" in kwargs:
+            headers.update(kwargs["headers"])
+        kwargs["headers"] = headers
 
-        await self._ensure_token()
         await self._rate_limit(method)
 
         retries = 0
         while True:
             try:
                 response = await self.client.request(method, endpoint, **kwargs)
-
-                response_text = (
-                    response.text.lower() if hasattr(response, "text") else ""
+                logger.debug(
+                    "%s %s -> %s over %s",
+                    method,
+                    endpoint,
+                    response.status_code,
+                    response.http_version,
                 )
-                # Check for DDoS protection in response
-                content_type = response.headers.get("content-type", "").lower()
-                is_json = "application/json" in content_type
-
-                is_ddos_protected = False
-                if not is_json:
-                    is_ddos_protected = (
-                        "ddos-guard" in response_text
-                        or "checking your browser" in response_text
-                        or (
-                            response.status_code == 403
-                            and "ddos-guard"
-                            in response.headers.get("server", "").lower()
-                        )
-                    )
 
-                if is_ddos_protected:
+                if _is_ddos_challenge(response):
                     # Log response text for debugging
-                    logger.warning(
-                        f"DDoS protection response text snippet: {response.text[:1000]}"
-                    )
-
-                if is_ddos_protected:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "DDoS protection response text snippet: %s",
+                            response.content[:1000].decode("utf-8", errors="replace"),
+                        )
                     retries += 1
                     if retries > max_retries:
                         logger.error(
-                            f"Request blocked by DDoS protection after {max_retries} retries. "
-                            f"Endpoint: {endpoint}, Status: {response.status_code}, Method: {method}"
+                            "Request blocked by DDoS protection after %s retries. Endpoint: %s, Status: %s, Method: %s",
+                            max_retries,
+                            endpoint,
+                            response.status_code,
+                            method,
                         )
                         raise HHAPIError(
                             429,
@@ -302,109 +645,93 @@ class HHClient:
                             },
                         )
 
-                    # Exponential backoff with much longer delays for DDoS protection
-                    # Base delay increases exponentially: 30s, 90s, 270s
-                    delay = 30 * (3**retries) + random.uniform(10, 20)
+                    # Same full-jitter backoff, on a much longer scale: windows
+                    # of 90s, 180s, 360s, then capped at 600s
+                    delay = _backoff_delay(
+                        _DDOS_BACKOFF_BASE_SECONDS, retries, _DDOS_BACKOFF_MAX_SECONDS
+                    )
                     logger.warning(
-                        f"DDoS protection detected on {method} {endpoint}. "
-                        f"Retry {retries}/{max_retries} after {delay:.2f}s. "
-                        f"Cookies: {len(self.client.cookies)} stored"
+                        "DDoS protection detected on %s %s. Retry %s/%s after %.2fs. Cookies: %s stored",
+                        method,
+                        endpoint,
+                        retries,
+                        max_retries,
+                        delay,
+                        len(self.client.cookies),
                     )
                     await asyncio.sleep(delay)
                     continue
 
                 if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    logger.warning(f"Rate limited. Waiting {retry_after} seconds")
-                    await asyncio.sleep(retry_after)
+                    retries += 1
+                    if retries > max_retries:
+                        logger.error(
+                            "Rate limited on %s %s after %s retries",
+                            method,
+                            endpoint,
+                            max_retries,
+                        )
+                        raise HHAPIError(
+                            429,
+                            "Rate limited by HH API. Please try again later.",
+                            {"status_code": response.status_code},
+                        )
+
+                    delay = _retry_delay(response, base_delay, retries)
+                    logger.warning(
+                        "Rate limited. Retry %s/%s after %.2fs",
+                        retries,
+                        max_retries,
+                        delay,
+                    )
+                    await asyncio.sleep(delay)
                     continue
 
-                if response.status_code in [502, 503, 504]:
+                # 503 means the request wasn't processed, so it's safe to retry
+                # for any method; other server errors only for idempotent ones
+                if response.status_code in _RETRYABLE_STATUSES and (
+                    method in _IDEMPOTENT_METHODS or response.status_code == 503
+                ):
                     retries += 1
                     if retries > max_retries:
                         logger.error(
-                            f"Gateway error {response.status_code} after {max_retries} retries"
+                            "Server error %s after %s retries",
+                            response.status_code,
+                            max_retries,
                         )
                         raise HHAPIError(
                             response.status_code,
-                            f"Gateway error after {max_retries} retries",
+                            f"Server error after {max_retries} retries",
                             {"status_code": response.status_code},
                         )
 
-                    delay = base_delay * (2**retries) + random.uniform(1, 3)
+                    delay = _retry_delay(response, base_delay, retries)
                     logger.warning(
-                        f"Gateway error {response.status_code}. Retry {retries}/{max_retries} after {delay:.2f}s"
+                        "Server error %s. Retry %s/%s after %.2fs",
+                        response.status_code,
+                        retries,
+                        max_retries,
+                        delay,
                     )
                     await asyncio.sleep(delay)
                     continue
 
-                response.raise_for_status()
-
-                if not response.text or response.text.strip() == "":
-                    return {
-                        "status": "success",
-                        "status_code": response.status_code,
-                    }
-
-                try:
-                    return response.json()
-                except json.JSONDecodeError as e:
-                    if response.status_code in [200, 201, 204]:
-                        return {
-                            "status": "success",
-                            "status_code": response.status_code,
-                        }
-                    logger.error(
-                        f"Failed to parse JSON response: {e}, Response text: {response.text[:500]}"
-                    )
-                    raise HHAPIError(
-                        500,
-                        f"Invalid JSON response: {e!s}",
-                        {"response_text": response.text[:500]},
-                    )
+                # Not Modified answers a conditional GET; the caller owns the body
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response
 
             except httpx.HTTPStatusError as e:
-                if e.response.status_code < 500 and e.response.status_code not in [
-                    429,
-                    408,
-                    502,
-                    503,
-                    504,
-                ]:
-                    error_data = {}
-                    try:
-                        error_data = e.response.json()
-                    except json.JSONDecodeError:
-                        error_data = {"message": e.response.text[:500]}
-
-                    logger.error(
-                        f"HH API client error: {e.response.status_code} - {error_data}, "
-                        f"Endpoint: {endpoint}, Method: {method}"
-                    )
-                    raise HHAPIError(
-                        e.response.status_code, str(error_data), error_data
-                    )
-
-                retries += 1
-                if retries > max_retries:
-                    error_data = {}
-                    try:
-                        error_data = e.response.json()
-                    except json.JSONDecodeError:
-                        error_data = {"message": e.response.text[:500]}
-
-                    logger.error(
-                        f"HH API error after {max_retries} retries: {e.response.status_code} - {error_data}"
-                    )
-                    raise HHAPIError(
-                        e.response.status_code, str(error_data), error_data
-                    )
-
-                delay = base_delay * (2**retries) + random.uniform(0.5, 1.5)
-                logger.warning(
-                    f"Server error. Retry {retries}/{max_retries} after {delay:.2f}s for {method} {endpoint}"
+                # Retryable statuses were handled above; anything left is final
+                error_data = _error_body(e.response)
+                logger.error(
+                    "HH API error: %s - %s, Endpoint: %s, Method: %s",
+                    e.response.status_code,
+                    error_data,
+                    endpoint,
+                    method,
                 )
-                await asyncio.sleep(delay)
+                raise HHAPIError(e.response.status_code, str(error_data), error_data)
 
             except (
                 httpx.ConnectError,
@@ -412,14 +739,27 @@ class HHClient:
                 httpx.WriteTimeout,
                 httpx.PoolTimeout,
             ) as e:
+                # A timeout mid-request may have reached HH; only connection
+                # failures are safe to retry for non-idempotent methods
+                if method not in _IDEMPOTENT_METHODS and isinstance(
+                    e, httpx.ReadTimeout | httpx.WriteTimeout
+                ):
+                    logger.error("Network error on %s %s: %s", method, endpoint, e)
+                    raise HHAPIError(503, f"Network error: {e!s}")
+
                 retries += 1
                 if retries > max_retries:
-                    logger.error(f"Network error after {max_retries} retries: {e!s}")
+                    logger.error("Network error after %s retries: %s", max_retries, e)
                     raise HHAPIError(503, f"Network error: {e!s}")
 
-                delay = base_delay * (2**retries) + random.uniform(0.5, 1.5)
+                delay = _backoff_delay(base_delay, retries)
                 logger.warning(
-                    f"Network error. Retry {retries}/{max_retries} after {delay:.2f}s for {method} {endpoint}"
+                    "Network error. Retry %s/%s after %.2fs for %s %s",
+                    retries,
+                    max_retries,
+                    delay,
+                    method,
+                    endpoint,
                 )
                 await asyncio.sleep(delay)
 
@@ -438,29 +778,24 @@ class HHClient:
         **kwargs,
     ) -> dict:
         """Search vacancies with API-level filtering."""
+        # Compare against None so valid falsy IDs (e.g. area 0) are still sent
+        optional = {
+            "text": text,
+            "area": area,
+            "experience": experience,
+            "employment": employment,
+            "schedule": schedule,
+            "salary": salary,
+            "currency": currency if salary is not None else None,
+            "only_with_salary": "true" if only_with_salary else None,
+        }
         params = {
             "page": page,
             "per_page": min(per_page, 100),
+            **{key: value for key, value in optional.items() if value is not None},
+            **kwargs,
         }
 
-        if text:
-            params["text"] = text
-        if area:
-            params["area"] = area
-        if experience:
-            params["experience"] = experience
-        if employment:
-            params["employment"] = employment
-        if schedule:
-            params["schedule"] = schedule
-        if salary:
-            params["salary"] = salary
-            params["currency"] = currency
-        if only_with_salary:
-            params["only_with_salary"] = "true"
-
-        params.update(kwargs)
-
         try:
             response = await self._make_request("GET", "/vacancies", params=params)
             return response
@@ -476,8 +811,12 @@ class HHClient:
 
     async def get_vacancy_details(self, vacancy_id: str) -> dict[str, Any]:
         """Get full vacancy details."""
+        cached = _vacancy_cache.get(vacancy_id)
+        if cached is not None:
+            return cached
         try:
             response = await self._make_request("GET", f"/vacancies/{vacancy_id}")
+            _vacancy_cache.set(vacancy_id, response)
             return response
         except HHAPIError as e:
             if e.status_code == 404:
@@ -499,7 +838,9 @@ class HHClient:
         except HHAPIError as e:
             if e.status_code == 404:
                 return []  # No questions for this vacancy
-            logger.warning(f"Could not fetch questions for vacancy {vacancy_id}: {e}")
+            logger.warning(
+                "Could not fetch questions for vacancy %s: %s", vacancy_id, e
+            )
             return []
 
     async def get_my_resumes(self) -> list[dict]:
@@ -531,43 +872,31 @@ class HHClient:
         """
         try:
             # Visit the HTML vacancy page first (like a browser would)
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(30.0),
-                follow_redirects=True,
-                cookies=self.client.cookies,  # Share cookies with main client
-            ) as temp_client:
-                headers = self._get_headers()
-                headers.update(
-                    {
-                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-                        "Sec-Fetch-Dest": "document",
-                        "Sec-Fetch-Mode": "navigate",
-                        "Sec-Fetch-Site": "none",
-                        "Sec-Fetch-User": "?1",
-                        "Referer": "https://hh.ru/search/vacancy",
-                    }
-                )
-
-                logger.info(f"Warming up: visiting vacancy page {vacancy_id}...")
-                await temp_client.get(
-                    f"https://hh.ru/vacancy/{vacancy_id}", headers=headers
-                )
+            headers = self._get_headers()
+            headers.update(
+                {
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+                    "Sec-Fetch-Dest": "document",
+                    "Sec-Fetch-Mode": "navigate",
+                    "Sec-Fetch-Site": "none",
+                    "Sec-Fetch-User": "?1",
+                    "Referer": "https://hh.ru/search/vacancy",
+                }
+            )
 
-                # Copy any new cookies back to main client
-                for cookie in temp_client.cookies.jar:
-                    self.client.cookies.set(
-                        name=cookie.name,
-                        value=cookie.value,
-                        domain=cookie.domain,
-                        path=cookie.path,
-                    )
+            logger.info("Warming up: visiting vacancy page %s...", vacancy_id)
+            await self.client.get(
+                f"https://hh.ru/vacancy/{vacancy_id}", headers=headers, timeout=30.0
+            )
 
             return True
         except httpx.TimeoutException as e:
-            logger.warning(f"Timeout warming up vacancy page {vacancy_id}: {e}")
+            logger.warning("Timeout warming up vacancy page %s: %s", vacancy_id, e)
             return False
         except httpx.RequestError as e:
-            logger.warning(f"Network error warming up vacancy page {vacancy_id}: {e}")
+            logger.warning(
+                "Network error warming up vacancy page %s: %s", vacancy_id, e
+            )
             return False
 
     async def apply(
@@ -578,9 +907,9 @@ class HHClient:
         answers: list[dict] | None = None,
     ) -> dict:
         """Submit application."""
-        if cover_letter and cover_letter.strip():
-            if len(cover_letter.strip()) < 50:
-                raise ValueError("Cover letter must be at least 50 characters long")
+        message = cover_letter.strip() if cover_letter else ""
+        if message and len(message) < 50:
+            raise ValueError("Cover letter must be at least 50 characters long")
 
         try:
             # Warm up by visiting the vacancy page first (mimics real user behavior)
@@ -591,8 +920,8 @@ class HHClient:
                 "resume_id": resume_id,
             }
 
-            if cover_letter and cover_letter.strip():
-                form_data["message"] = cover_letter.strip()
+            if message:
+                form_data["message"] = message
 
             if answers:
                 for answer in answers:
@@ -601,19 +930,16 @@ class HHClient:
                     if question_id and answer_text:
                         form_data[f"answer_{question_id}"] = answer_text.strip()
                 logger.info(
-                    f"Adding {len(answers)} screening question answers to application"
+                    "Adding %s screening question answers to application", len(answers)
                 )
 
-            # Use consistent headers but customize for POST application
-            apply_headers = self._get_headers()
-
-            # NOTE: Removed manual Origin/Referer/Sec-Fetch headers to behave like a proper API client.
-            # HH.ru API might flag requests that look like "fake browsers" mixed with API tokens.
-
-            response = await self._make_request(
-                "POST", "/negotiations", data=form_data, headers=apply_headers
-            )
-            logger.info(f"Successfully applied to vacancy {vacancy_id}")
+            # Default session headers apply; no browser-only Origin/Referer/
+            # Sec-Fetch overrides, as HH.ru might flag "fake browser" requests
+            # mixed with API tokens.
+            response = await self._make_request("POST", "/negotiations", data=form_data)
+            logger.info("Successfully applied to vacancy %s", vacancy_id)
+            # Vacancy relations change once we've applied
+            _vacancy_cache.pop(vacancy_id)
             return response or {"status": "success"}
 
         except HHAPIError as e:
@@ -621,26 +947,21 @@ class HHClient:
             error_data = e.response_data or {}
             errors = error_data.get("errors", [])
             if any(err.get("value") == "test_required" for err in errors):
-                logger.info(f"Vacancy {vacancy_id} requires mandatory test. Skipping.")
+                logger.info("Vacancy %s requires mandatory test. Skipping.", vacancy_id)
                 raise HTTPException(
                     status_code=403,
                     detail="Vacancy requires mandatory test",
                 )
 
-            error_messages = {
-                400: "Invalid application data or already applied to this vacancy",
-                403: "Access denied - you may not be eligible for this vacancy",
-                404: "Vacancy or resume not found",
-                409: "Application already exists for this vacancy",
-            }
-
-            error_detail = error_messages.get(
+            error_detail = self._APPLY_ERROR_MESSAGES.get(
                 e.status_code, f"Application failed with HTTP {e.status_code}"
             )
 
             logger.error(
-                f"Application failed for vacancy {vacancy_id}: "
-                f"Status {e.status_code}, Response: {e.response_data}"
+                "Application failed for vacancy %s: Status %s, Response: %s",
+                vacancy_id,
+                e.status_code,
+                e.response_data,
             )
 
             raise HTTPException(
@@ -664,46 +985,49 @@ class HHClient:
 
     async def get_applied_vacancy_ids(self) -> set[str]:
         """Get set of all vacancy IDs user has already applied to."""
-        applied_ids = set()
-        page = 0
         per_page = 100
+        semaphore = asyncio.Semaphore(self.NEGOTIATION_PAGE_CONCURRENCY)
 
-        try:
-            while True:
+        async def _fetch(page: int) -> list[dict]:
+            async with semaphore:
                 response = await self._make_request(
                     "GET",
                     "/negotiations",
                     params={"page": page, "per_page": per_page},
                 )
+            return response.get("items", [])
 
-                items = response.get("items", [])
-                if not items:
-                    break
-
-                for item in items:
-                    vacancy = item.get("vacancy", {})
-                    vacancy_id = vacancy.get("id")
-                    if vacancy_id:
-                        applied_ids.add(str(vacancy_id))
-
-                pages = response.get("pages", 1)
-                if page >= pages - 1:
-                    break
-
-                page += 1
-                await asyncio.sleep(0.5)
+        try:
+            # The first page tells us how many pages to fetch concurrently
+            first = await self._make_request(
+                "GET", "/negotiations", params={"page": 0, "per_page": per_page}
+            )
+            pages = first.get("pages", 1)
+            if pages > self.MAX_NEGOTIATION_PAGES:
+                logger.warning("Reached page limit when fetching applied vacancies")
+
+            rest = await asyncio.gather(
+                *(
+                    _fetch(page)
+                    for page in range(1, min(pages, self.MAX_NEGOTIATION_PAGES))
+                )
+            )
 
-                if page >= 20:
-                    logger.warning("Reached page limit when fetching applied vacancies")
-                    break
+            applied_ids = set()
+            for items in (first.get("items", []), *rest):
+                applied_ids |= {
+                    str(item["vacancy"]["id"])
+                    for item in items
+                    if (item.get("vacancy") or {}).get("id")
+                }
 
             logger.info(
-                f"Found {len(applied_ids)} previously applied vacancies from HH.ru"
+                "Found %s previously applied vacancies from HH.ru", len(applied_ids)
             )
             return applied_ids
 
         except HHAPIError as e:
-            logger.error(f"Failed to fetch applied vacancies: {e}")
+            logger.error("Failed to fetch applied vacancies: %s", e)
             return set()
 
     # ==================== Chat/Negotiations Methods ====================
@@ -727,11 +1051,14 @@ class HHClient:
                 if item.get("has_updates", False):
                     negotiations.append(item)
 
-            logger.info(f"Found {len(negotiations)} negotiations with unread messages")
+            logger.info("Found %s negotiations with unread messages", len(negotiations))
             return negotiations
 
         except HHAPIError as e:
-            logger.error(f"Failed to fetch negotiations: {e}")
+            # Let callers back off on rate limiting and upstream outages
+            if e.status_code == 429 or e.status_code >= 500:
+                raise
+            logger.error("Failed to fetch negotiations: %s", e)
             return []
 
     async def get_negotiation_messages(self, negotiation_id: str) -> list[dict]:
@@ -752,10 +1079,10 @@ class HHClient:
 
         except HHAPIError as e:
             if e.status_code == 404:
-                logger.warning(f"Negotiation {negotiation_id} not found")
+                logger.warning("Negotiation %s not found", negotiation_id)
                 return []
             logger.error(
-                f"Failed to fetch messages for negotiation {negotiation_id}: {e}"
+                "Failed to fetch messages for negotiation %s: %s", negotiation_id, e
             )
             return []
 
@@ -777,11 +1104,13 @@ class HHClient:
                 f"/negotiations/{negotiation_id}/messages",
                 data={"message": message},
             )
-            logger.info(f"Message sent to negotiation {negotiation_id}")
+            logger.info("Message sent to negotiation %s", negotiation_id)
             return response
 
         except HHAPIError as e:
-            logger.error(f"Failed to send message to negotiation {negotiation_id}: {e}")
+            logger.error(
+                "Failed to send message to negotiation %s: %s", negotiation_id, e
+            )
             return None
 
     async def get_negotiation_details(self, negotiation_id: str) -> dict | None:
@@ -803,7 +1132,7 @@ class HHClient:
         except HHAPIError as e:
             if e.status_code == 404:
                 return None
-            logger.error(f"Failed to fetch negotiation {negotiation_id}: {e}")
+            logger.error("Failed to fetch negotiation %s: %s", negotiation_id, e)
             return None
 
     async def mark_negotiation_read(self, negotiation_id: str) -> bool:
@@ -821,11 +1150,11 @@ class HHClient:
                 f"/negotiations/{negotiation_id}",
                 data={"viewed": True},
             )
-            logger.debug(f"Marked negotiation {negotiation_id} as read")
+            logger.debug("Marked negotiation %s as read", negotiation_id)
             return True
 
         except HHAPIError as e:
-            logger.error(f"Failed to mark negotiation {negotiation_id} as read: {e}")
+            logger.error("Failed to mark negotiation %s as read: %s", negotiation_id, e)
             return False
 
     # ==================== End Chat/Negotiations Methods ====================
@@ -852,51 +1181,56 @@ class HHClient:
         max_retries = 3
         base_delay = 2.0
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for attempt in range(max_retries + 1):
-                try:
-                    if attempt > 0:
-                        delay = base_delay * (2 ** (attempt - 1)) + random.uniform(0, 1)
-                        logger.info(
-                            f"Token exchange retry {attempt}/{max_retries} after {delay:.2f}s"
-                        )
-                        await asyncio.sleep(delay)
-
-                    response = await client.post(
-                        self.TOKEN_URL, data=data, headers=headers
+        for attempt in range(max_retries + 1):
+            try:
+                if attempt > 0:
+                    delay = _backoff_delay(base_delay, attempt)
+                    logger.info(
+                        "Token exchange retry %s/%s after %.2fs",
+                        attempt,
+                        max_retries,
+                        delay,
                     )
+                    await asyncio.sleep(delay)
 
-                    # Check if we got DDoS protection page
-                    if "ddos-guard" in response.text.lower():
-                        if attempt < max_retries:
-                            logger.warning(
-                                f"DDoS protection detected, retrying... ({attempt + 1}/{max_retries + 1})"
-                            )
-                            continue
-                        else:
-                            raise HTTPException(
-                                status_code=429,
-                                detail="Request blocked by DDoS protection. Please try again later.",
-                            )
-
-                    response.raise_for_status()
-                    token_data = response.json()
-                    token_data["obtained_at"] = datetime.now(UTC).replace(tzinfo=None)
-                    return token_data
+                response = await self.client.post(
+                    self.TOKEN_URL, data=data, headers=headers
+                )
 
-                except httpx.HTTPStatusError as e:
-                    if attempt < max_retries and e.response.status_code >= 500:
+                # Check if we got DDoS protection page
+                if _is_ddos_challenge(response):
+                    if attempt < max_retries:
+                        logger.warning(
+                            "DDoS protection detected, retrying... (%s/%s)",
+                            attempt + 1,
+                            max_retries + 1,
+                        )
                         continue
-                    logger.error(f"Token exchange failed: {e.response.text}")
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Token exchange failed: {e.response.text}",
-                    )
+                    else:
+                        raise HTTPException(
+                            status_code=429,
+                            detail="Request blocked by DDoS protection. Please try again later.",
+                        )
 
-            raise HTTPException(
-                status_code=429,
-                detail="Token exchange failed after all retry attempts",
-            )
+                response.raise_for_status()
+                token_data = response.json()
+                token_data["obtained_at"] = _now()
+                return token_data
+
+            except httpx.HTTPStatusError as e:
+                if attempt < max_retries and e.response.status_code >= 500:
+                    continue
+                error_data = _error_body(e.response)
+                logger.error("Token exchange failed: %s", error_data)
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Token exchange failed: {error_data}",
+                )
+
+        raise HTTPException(
+            status_code=429,
+            detail="Token exchange failed after all retry attempts",
+        )
 
     async def refresh_token(self, refresh_token: str) -> dict:
         """Refresh access token using refresh token."""
@@ -907,90 +1241,111 @@ class HHClient:
             "client_secret": settings.hh_client_secret,
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.TOKEN_URL, data=data)
-                response.raise_for_status()
-                token_data = response.json()
-                token_data["obtained_at"] = datetime.now(UTC).replace(tzinfo=None)
-                return token_data
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Token refresh failed: {e.response.text}")
+        try:
+            response = await self.client.post(self.TOKEN_URL, data=data)
+            response.raise_for_status()
+            token_data = response.json()
+            token_data["obtained_at"] = _now()
+            return token_data
+        except httpx.HTTPStatusError as e:
+            logger.error("Token refresh failed: %s", _error_body(e.response))
+            if e.response.status_code >= 500:
                 raise HTTPException(
-                    status_code=400,
-                    detail="Token refresh failed. Please re-authenticate.",
+                    status_code=502,
+                    detail="HH.ru token service unavailable. Please try again later.",
                 )
+            raise HTTPException(
+                status_code=400,
+                detail="Token refresh failed. Please re-authenticate.",
+            )
+
+    async def _get_reference_data(self, endpoint: str) -> Any:
+        """Fetch rarely-changing reference data, revalidating with ETags.
+
+        Fresh entries are served from memory. Once the TTL lapses the request
+        carries If-None-Match, and a 304 reuses the previously parsed body.
+        """
+        cached = _reference_cache.get(endpoint)
+        if cached is not None:
+            return cached
+
+        etag, stale = _reference_etags.get(endpoint, (None, None))
+        headers = {"If-None-Match": etag} if etag else {}
+        response = await self._send_request("GET", endpoint, headers=headers)
+
+        if response.status_code == 304 and stale is not None:
+            data = stale
+        else:
+            data = _parse_json_body(response)
+            if new_etag := response.headers.get("ETag"):
+                _reference_etags[endpoint] = (new_etag, data)
+
+        _reference_cache.set(endpoint, data)
+        return data
 
     async def get_areas(self) -> list[dict]:
         """Get available areas (cities/regions)."""
         try:
-            response = await self._make_request("GET", "/areas")
-            return response
+            return await self._get_reference_data("/areas")
         except HHAPIError as e:
             raise HTTPException(e.status_code, f"Failed to fetch areas: {e.message}")
 
     async def get_specializations(self) -> list[dict]:
         """Get available job specializations."""
         try:
-            response = await self._make_request("GET", "/specializations")
-            return response
+            return await self._get_reference_data("/specializations")
         except HHAPIError as e:
             raise HTTPException(
                 e.status_code, f"Failed to fetch specializations: {e.message}"
             )
 
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client if this instance created it."""
+        if self._owns_client:
+            await self.client.aclose()
 
-    async def get_user_info(self, access_token: str) -> dict:
-        """Get current user information."""
+    async def _get_by_token(self, access_token: str, endpoint: str) -> Any:
+        """GET an endpoint on behalf of the owner of ``access_token``."""
         headers = {
             "Authorization": f"Bearer {access_token}",
             "User-Agent": "ApplyBot/1.0",
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.get("https://api.hh.ru/me", headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await self.client.get(endpoint, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_user_info(self, access_token: str) -> dict:
+        """Get current user information."""
+        return await self._get_by_token(access_token, "/me")
 
     async def get_user_resumes(self, access_token: str) -> list[dict]:
         """Get user's resumes list."""
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "User-Agent": "ApplyBot/1.0",
-        }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.hh.ru/resumes/mine", headers=headers
-            )
-            response.raise_for_status()
-            return response.json().get("items", [])
+        data = await self._get_by_token(access_token, "/resumes/mine")
+        return data.get("items", [])
 
     async def get_resume_details_by_token(
         self, access_token: str, resume_id: str
     ) -> dict:
         """Get detailed resume information by token."""
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "User-Agent": "ApplyBot/1.0",
-        }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.hh.ru/resumes/{resume_id}", headers=headers
-            )
-            response.raise_for_status()
-            return response.json()
+        return await self._get_by_token(access_token, f"/resumes/{resume_id}")
 
     async def get_user_profile_for_application(
         self, access_token: str, resume_id: str | None = None
     ) -> dict:
         """Get user profile for bulk application."""
-        user_info = await self.get_user_info(access_token)
+        # /me and /resumes/mine are independent, so fetch them together
+        user_info, resumes = await asyncio.gather(
+            self.get_user_info(access_token),
+            self.get_user_resumes(access_token),
+            return_exceptions=True,
+        )
+        # Wait for both before raising so neither request is left orphaned
+        for result, what in ((user_info, "user information"), (resumes, "resumes")):
+            if isinstance(result, BaseException):
+                logger.error("Failed to fetch %s from HH.ru: %s", what, result)
+                raise result
         if not user_info:
             raise ValueError("Failed to get user information")
-
-        resumes = await self.get_user_resumes(access_token)
         if not resumes:
             raise ValueError("User has no resumes on HH.ru")
 
@@ -1010,17 +1365,18 @@ class HHClient:
         if not resume:
             raise ValueError("Failed to get resume details")
 
-        def safe_get(data, *keys, default=None):
-            """Safely get nested values from a dictionary."""
-            result = data
-            for key in keys:
-                if result is None:
-                    return default
-                if isinstance(result, dict):
-                    result = result.get(key)
-                else:
-                    return default
-            return result if result is not None else default
+        # First phone and email in a single pass over the contacts
+        phone = email = None
+        for contact in resume.get("contact") or []:
+            if not contact:
+                continue
+            contact_type = (contact.get("type") or {}).get("id")
+            if contact_type == "cell" and phone is None:
+                phone = contact.get("value")
+            elif contact_type == "email" and email is None:
+                email = contact.get("value")
+            if phone is not None and email is not None:
+                break
 
         profile = {
             "user": {
@@ -1034,10 +1390,10 @@ class HHClient:
                 "id": resume.get("id"),
                 "title": resume.get("title"),
                 "age": resume.get("age"),
-                "gender": safe_get(resume, "gender", "name"),
-                "area": safe_get(resume, "area", "name"),
+                "gender": _safe_get(resume, "gender", "name"),
+                "area": _safe_get(resume, "area", "name"),
                 "salary": resume.get("salary"),
-                "photo": safe_get(resume, "photo", "medium"),
+                "photo": _safe_get(resume, "photo", "medium"),
             },
             "experience": [
                 {
@@ -1056,7 +1412,7 @@ class HHClient:
                 if skill
             ],
             "education": {
-                "level": safe_get(resume, "education", "level", "name"),
+                "level": _safe_get(resume, "education", "level", "name"),
                 "primary": [
                     {
                         "name": edu.get("name") or "",
@@ -1071,51 +1427,32 @@ class HHClient:
             "languages": [
                 {
                     "name": lang.get("name") or "",
-                    "level": safe_get(lang, "level", "name") or "",
+                    "level": _safe_get(lang, "level", "name") or "",
                 }
                 for lang in resume.get("language", [])
                 if lang
             ],
-            "contacts": {
-                "phone": next(
-                    (
-                        c.get("value")
-                        for c in resume.get("contact", [])
-                        if c and c.get("type", {}).get("id") == "cell"
-                    ),
-                    None,
-                ),
-                "email": next(
-                    (
-                        c.get("value")
-                        for c in resume.get("contact", [])
-                        if c and c.get("type", {}).get("id") == "email"
-                    ),
-                    None,
-                ),
-            },
+            "contacts": {"phone": phone, "email": email},
             "citizenship": [c.get("name") for c in resume.get("citizenship", []) if c],
             "work_ticket": [w.get("name") for w in resume.get("work_ticket", []) if w],
-            "travel_time": safe_get(resume, "travel_time", "name"),
-            "business_trip_readiness": safe_get(
+            "travel_time": _safe_get(resume, "travel_time", "name"),
+            "business_trip_readiness": _safe_get(
                 resume, "business_trip_readiness", "name"
             ),
-            "relocation": safe_get(resume, "relocation", "type", "name"),
+            "relocation": _safe_get(resume, "relocation", "type", "name"),
         }
 
         return profile
 
 
-async def get_hh_client():
-    """FastAPI dependency for HH client with proper cleanup."""
-    client = HHClient()
-    try:
-        yield client
-    finally:
-        await client.close()
-
+async def get_hh_client(request: Request) -> HHClient:
+    """FastAPI dependency returning the app-wide HH client.
 
-async def get_hh_client_context():
-    """Context manager version for use in services."""
-    async with HHClient() as client:
-        return client
+    The client is created and closed by the application lifespan so that its
+    connection pool and token cache are shared across requests.
+    """
+    client = getattr(request.app.state, "hh_client", None)
+    if client is None:
+        # Lifespan didn't run (e.g. TestClient used without a context manager)
+        client = request.app.state.hh_client = HHClient()
+    return client
@@ -1,12 +1,46 @@
 """Base class for LLM providers."""
 
+import re
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from typing import Any
 
+_CYRILLIC_RE = re.compile(r"[\u0400-\u04ff]")
+# The Cyrillic share settles quickly, so long texts are only sampled
+_LANGUAGE_SAMPLE_CHARS = 2048
+
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        """Generate text from a prompt.
+
+        Args:
+            prompt: Complete prompt to send to the model
+
+        Returns:
+            Generated text
+
+        Raises:
+            ValueError: If the model fails or returns nothing
+        """
+        pass
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield generated text incrementally.
+
+        Providers without native streaming yield the full text once.
+
+        Args:
+            prompt: Complete prompt to send to the model
+
+        Yields:
+            Chunks of generated text
+        """
+        yield await self.generate(prompt)
+
     @abstractmethod
     async def generate_cover_letter(
         self, vacancy: dict[str, Any], user_profile: dict[str, Any]
@@ -41,7 +75,14 @@ class LLMProvider(ABC):
         """
         pass
 
-    def _detect_language(self, text: str) -> str:
+    @staticmethod
+    def _has_cyrillic(*texts: str | None) -> bool:
+        """Check whether any of the texts contains a Cyrillic letter."""
+        return any(text and _CYRILLIC_RE.search(text) for text in texts)
+
+    @staticmethod
+    def _detect_language(text: str) -> str:
         """Detect if text is Russian or English."""
-        cyrillic_count = sum(1 for c in text if "\u0400" <= c <= "\u04ff")
-        return "ru" if cyrillic_count > len(text) * 0.3 else "en"
+        sample = text[:_LANGUAGE_SAMPLE_CHARS]
+        cyrillic_count = len(_CYRILLIC_RE.findall(sample))
+        return "ru" if cyrillic_count > len(sample) * 0.3 else "en"
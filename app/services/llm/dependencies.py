@@ -1,27 +1,27 @@
 """FastAPI dependencies for LLM providers."""
 
-from collections.abc import AsyncGenerator
+from fastapi import Request
 
-from fastapi import Depends
-
-from app.services.hh_client import HHClient
+from app.services.hh_client import HHClient, get_hh_client
 from app.services.llm.base import LLMProvider
 from app.services.llm.factory import get_llm_provider
 
 
-async def hh_client_dep() -> AsyncGenerator[HHClient, None]:
-    """Dependency for HH client."""
-    client = HHClient()
-    try:
-        yield client
-    finally:
-        await client.close()
+async def hh_client_dep(request: Request) -> HHClient:
+    """Dependency for the shared HH client."""
+    return await get_hh_client(request)
+
 
+def llm_provider_dep(request: Request) -> LLMProvider:
+    """FastAPI dependency returning the app-wide LLM provider.
 
-def llm_provider_dep(
-    provider: LLMProvider = Depends(get_llm_provider),
-) -> LLMProvider:
-    """FastAPI dependency for LLM provider."""
+    The provider and its pooled HTTP client are created and closed by the
+    application lifespan so connections are reused across requests.
+    """
+    provider = getattr(request.app.state, "llm_provider", None)
+    if provider is None:
+        # Lifespan didn't run (e.g. TestClient used without a context manager)
+        provider = request.app.state.llm_provider = get_llm_provider()
     return provider
 
 
@@ -1,15 +1,38 @@
 """Factory for creating LLM providers."""
 
+import httpx
+
 from app.core.config import settings
 from app.services.llm.base import LLMProvider
 from app.services.llm.providers import OllamaProvider
 
 
-def get_llm_provider() -> LLMProvider:
-    """Get the configured LLM provider instance."""
+def create_llm_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client shared by LLM provider calls.
+
+    Timeouts are set per request by the SDK, so only pooling is configured.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=20,
+            keepalive_expiry=60.0,
+        ),
+    )
+
+
+def get_llm_provider(http_client: httpx.AsyncClient | None = None) -> LLMProvider:
+    """Get the configured LLM provider instance.
+
+    Args:
+        http_client: Shared pooled client; the SDK creates its own if omitted
+    """
     if settings.llm_provider == "ollama":
         return OllamaProvider(
             base_url=settings.ollama_base_url,
             model=settings.ollama_model,
+            http_client=http_client,
+            max_concurrency=settings.llm_max_concurrency,
+            max_retries=settings.llm_max_retries,
         )
     raise ValueError(f"Unknown LLM provider: {settings.llm_provider}")
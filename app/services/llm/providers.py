@@ -1,88 +1,77 @@
 import asyncio
+import hashlib
 import logging
 import re
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from html import unescape
 from typing import Any
 
-from openai import APIError, APITimeoutError, OpenAI
+import httpx
+from openai import APIError, APITimeoutError, AsyncOpenAI
 
 from app.services.llm.base import LLMProvider
 
 logger = logging.getLogger(__name__)
 
-
-class OllamaProvider(LLMProvider):
-    """Ollama LLM provider using OpenAI-compatible API."""
-
-    def __init__(
-        self,
-        base_url: str = "http://localhost:11434",
-        model: str = "qwen3:14b",
-    ):
-        self.client = OpenAI(
-            base_url=f"{base_url}/v1",
-            api_key="ollama",  # Ollama doesn't require API key
-            timeout=300.0,  # 5 minute timeout for CPU inference
-        )
-        self.model = model
-        self.base_url = base_url
-
-    async def generate(self, prompt: str) -> str:
-        """Generate text from a prompt."""
-        try:
-            logger.info(f"Calling Ollama at {self.base_url} with model {self.model}")
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional copywriter. /no_think",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=2000,
-                temperature=0.2,
-            )
-            if not response.choices:
-                raise ValueError("Empty response from LLM")
-            content = response.choices[0].message.content
-            if not content:
-                raise ValueError("Empty content in response")
-            logger.info(f"Ollama response received, length: {len(content)}")
-            return content.strip()
-        except ValueError:
-            raise
-        except APITimeoutError as e:
-            logger.error(f"LLM timeout: {e}")
-            raise ValueError("LLM request timed out") from e
-        except APIError as e:
-            logger.error(f"LLM API error: {e}")
-            raise ValueError(f"LLM API error: {e!s}") from e
-
-    async def generate_cover_letter(
-        self, vacancy: dict[str, Any], user_profile: dict[str, Any]
-    ) -> str:
-        """Generate a cover letter for a job vacancy."""
-        company = vacancy.get("employer", {}).get("name", "the company")
-        position = vacancy.get("name", "this position")
-        requirements = vacancy.get("snippet", {}).get("requirement", "")
-        responsibilities = vacancy.get("snippet", {}).get("responsibility", "")
-        description = vacancy.get("description", "")
-        if description and "<" in description:
-            description = re.sub(r"<[^>]+>", "", description)
-
-        key_skills = [skill.get("name", "") for skill in vacancy.get("key_skills", [])]
-
-        is_russian = any(
-            char in (requirements + responsibilities + description)
-            for char in "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
-        )
-
-        candidate_name = user_profile.get("name", "Кандидат")
-        candidate_email = user_profile.get("email", "")
-
-        if is_russian:
-            prompt = f"""Напишите профессиональное сопроводительное письмо для данной вакансии:
+# Comments, script/style blocks, then any tag (quoted attributes may hold ">")
+_HTML_MARKUP_RE = re.compile(
+    r"<!--.*?-->|<(script|style)\b.*?</\1\s*>|<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>",
+    re.DOTALL | re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Description excerpt length in the cover-letter prompt. Markup is stripped
+# from a bounded head of the HTML, not the whole (often 5-20 KB) posting.
+_DESCRIPTION_CHARS = 800
+_DESCRIPTION_HTML_CHARS = 4 * _DESCRIPTION_CHARS
+
+
+# Markup cut off by the head slice: an unclosed script/style block or comment,
+# or a trailing tag (possibly inside a quoted attribute) with no closing ">"
+_TRUNCATED_MARKUP_RE = re.compile(
+    r"<(script|style)\b(?:(?!</\1\s*>).)*$"
+    r"|<!--(?:(?!-->).)*$"
+    r"|<(?:[^>\"']|\"[^\"]*\"|'[^']*')*(?:\"[^\"]*|'[^']*)?$",
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+def _html_to_text(html: str) -> str:
+    """Reduce a vacancy description to plain text for the prompt."""
+    text = unescape(_HTML_MARKUP_RE.sub(" ", html))
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _description_excerpt(description: str) -> str:
+    """Get the plain-text head of a vacancy description for the prompt."""
+    if "<" in description:
+        head = description[:_DESCRIPTION_HTML_CHARS]
+        description = _html_to_text(_TRUNCATED_MARKUP_RE.sub("", head, count=1))
+    return description[:_DESCRIPTION_CHARS]
+
+
+# Fallbacks for missing profile/vacancy fields, per prompt language
+_NOT_SPECIFIED = {
+    "ru": {
+        "experience": "Не указан",
+        "skills": "Не указаны",
+        "education": "Не указано",
+        "position": "Не указана",
+        "job": "Должность",
+        "employer": "Компании",
+    },
+    "en": {
+        "experience": "Not specified",
+        "skills": "Not specified",
+        "education": "Not specified",
+        "position": "Not specified",
+        "job": "Position",
+        "employer": "Company",
+    },
+}
+
+_COVER_LETTER_PROMPT_RU = """Напишите профессиональное сопроводительное письмо для данной вакансии:
 
 ДОЛЖНОСТЬ: {position}
 КОМПАНИЯ: {company}
@@ -93,18 +82,18 @@ class OllamaProvider(LLMProvider):
 ОСНОВНЫЕ ОБЯЗАННОСТИ:
 {responsibilities}
 
-КЛЮЧЕВЫЕ НАВЫКИ: {", ".join(key_skills) if key_skills else "Не указаны"}
+КЛЮЧЕВЫЕ НАВЫКИ: {key_skills}
 
 ОПИСАНИЕ ВАКАНСИИ:
-{description[:800]}...
+{description}...
 
 ПРОФИЛЬ КАНДИДАТА:
 - Имя: {candidate_name}
 - Email: {candidate_email}
-- Опыт: {user_profile.get("experience", "Не указан")}
-- Навыки: {user_profile.get("skills", "Не указаны")}
-- Образование: {user_profile.get("education", "Не указано")}
-- Текущая должность: {user_profile.get("position", "Не указана")}
+- Опыт: {experience}
+- Навыки: {skills}
+- Образование: {education}
+- Текущая должность: {position_current}
 
 ИНСТРУКЦИИ:
 1. Напишите краткое, профессиональное сопроводительное письмо (200-300 слов)
@@ -122,8 +111,8 @@ class OllamaProvider(LLMProvider):
 - Выводите ТОЛЬКО текст письма, ничего больше
 
 Сгенерируйте сопроводительное письмо:"""
-        else:
-            prompt = f"""Write a professional cover letter for this job application:
+
+_COVER_LETTER_PROMPT_EN = """Write a professional cover letter for this job application:
 
 POSITION: {position}
 COMPANY: {company}
@@ -134,18 +123,18 @@ JOB REQUIREMENTS:
 KEY RESPONSIBILITIES:
 {responsibilities}
 
-REQUIRED SKILLS: {", ".join(key_skills) if key_skills else "Not specified"}
+REQUIRED SKILLS: {key_skills}
 
 JOB DESCRIPTION:
-{description[:800]}...
+{description}...
 
 CANDIDATE PROFILE:
 - Name: {candidate_name}
 - Email: {candidate_email}
-- Experience: {user_profile.get("experience", "Not specified")}
-- Skills: {user_profile.get("skills", "Not specified")}
-- Education: {user_profile.get("education", "Not specified")}
-- Current Position: {user_profile.get("position", "Not specified")}
+- Experience: {experience}
+- Skills: {skills}
+- Education: {education}
+- Current Position: {position_current}
 
 INSTRUCTIONS:
 1. Write a concise, professional cover letter (200-300 words)
@@ -164,114 +153,250 @@ IMPORTANT:
 
 Generate the cover letter:"""
 
-        return await self.generate(prompt)
+_SCREENING_PROMPT_RU = """Ответьте на вопрос работодателя профессионально:
 
-    async def answer_screening_questions(
-        self,
-        questions: list[dict[str, Any]],
-        vacancy: dict[str, Any],
-        user_profile: dict[str, Any],
-    ) -> list[dict[str, str]]:
-        """Generate answers for job screening questions."""
-        if not questions:
-            return []
-
-        questions_text = ""
-        for i, q in enumerate(questions, 1):
-            question_text = q.get("text", q.get("question", str(q)))
-            questions_text += f"{i}. {question_text}\n"
-
-        sample_text = questions_text + vacancy.get("name", "")
-        is_russian = any(
-            char in sample_text for char in "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
-        )
-
-        if is_russian:
-            prompt = f"""Ответьте на эти вопросы работодателя профессионально:
-
-ВАКАНСИЯ: {vacancy.get("name", "Должность")} в {vacancy.get("employer", {}).get("name", "Компании")}
+ВАКАНСИЯ: {job} в {employer}
 
 ПРОФИЛЬ КАНДИДАТА:
-- Опыт: {user_profile.get("experience", "Не указан")}
-- Навыки: {user_profile.get("skills", "Не указаны")}
-- Образование: {user_profile.get("education", "Не указано")}
-- Текущая роль: {user_profile.get("current_position", "Не указана")}
+- Опыт: {experience}
+- Навыки: {skills}
+- Образование: {education}
+- Текущая роль: {current_position}
 
-ВОПРОСЫ:
-{questions_text}
+ВОПРОС:
+{question}
 
 ИНСТРУКЦИИ:
-1. Отвечайте на каждый вопрос прямо и профессионально
-2. Делайте ответы краткими (2-3 предложения на вопрос)
+1. Ответьте на вопрос прямо и профессионально
+2. Сделайте ответ кратким (2-3 предложения)
 3. Будьте честными, основываясь на профиле кандидата
 4. Показывайте энтузиазм и профессионализм
-5. Форматируйте как: Ответ 1: [ответ], Ответ 2: [ответ], и т.д.
 
-Предоставьте только пронумерованные ответы."""
-        else:
-            prompt = f"""Answer these job screening questions professionally:
+Предоставьте только текст ответа."""
+
+_SCREENING_PROMPT_EN = """Answer this job screening question professionally:
 
-JOB: {vacancy.get("name", "Position")} at {vacancy.get("employer", {}).get("name", "Company")}
+JOB: {job} at {employer}
 
 CANDIDATE PROFILE:
-- Experience: {user_profile.get("experience", "Not specified")}
-- Skills: {user_profile.get("skills", "Not specified")}
-- Education: {user_profile.get("education", "Not specified")}
-- Current Role: {user_profile.get("current_position", "Not specified")}
+- Experience: {experience}
+- Skills: {skills}
+- Education: {education}
+- Current Role: {current_position}
 
-QUESTIONS:
-{questions_text}
+QUESTION:
+{question}
 
 INSTRUCTIONS:
-1. Answer each question directly and professionally
-2. Keep answers concise (2-3 sentences each)
+1. Answer the question directly and professionally
+2. Keep the answer concise (2-3 sentences)
 3. Be honest based on the candidate profile
 4. Show enthusiasm and professionalism
-5. Format as: Answer 1: [answer], Answer 2: [answer], etc.
 
-Provide only the numbered answers."""
+Provide only the answer text."""
 
-        response = await self.generate(prompt)
-        return self._parse_screening_answers(response, questions)
+# Used when the model fails or returns nothing for a question
+_FALLBACK_ANSWER = {
+    "ru": "Я очень заинтересован в этой возможности и считаю, что мой опыт будет ценным для этой роли.",
+    "en": "I am very interested in this opportunity and believe my experience would be valuable for this role.",
+}
 
-    def _parse_screening_answers(
-        self, response: str, questions: list[dict[str, Any]]
-    ) -> list[dict[str, str]]:
-        """Parse LLM response into structured answers."""
-        answer_patterns = [
-            r"(?:Answer|Ответ) (\d+):\s*(.+?)(?=(?:Answer|Ответ) \d+:|$)",
-            r"(\d+)\.\s*(.+?)(?=\d+\.|$)",
-        ]
-
-        matches = []
-        for pattern in answer_patterns:
-            matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-            if matches:
-                break
 
-        structured_answers = []
+class OllamaProvider(LLMProvider):
+    """Ollama LLM provider using OpenAI-compatible API."""
 
-        for i, question in enumerate(questions):
-            question_id = question.get("id", str(i))
-            answer_text = ""
+    # Identical prompts (retried or re-queued applications) reuse the last answer
+    PROMPT_CACHE_SIZE = 256
 
-            for match in matches:
-                answer_num = int(match[0]) - 1
-                if answer_num == i:
-                    answer_text = match[1].strip()
-                    break
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "qwen3:14b",
+        http_client: httpx.AsyncClient | None = None,
+        max_concurrency: int = 4,
+        max_retries: int = 2,
+    ):
+        self.client = AsyncOpenAI(
+            base_url=f"{base_url}/v1",
+            api_key="ollama",  # Ollama doesn't require API key
+            timeout=300.0,  # 5 minute timeout for CPU inference
+            http_client=http_client,
+            # The SDK backs off and retries transient failures itself
+            max_retries=max_retries,
+        )
+        self.model = model
+        self.base_url = base_url
+        self._prompt_cache: OrderedDict[bytes, str] = OrderedDict()
+        # Fanned-out screening answers would otherwise queue up inside Ollama
+        # and run into the client timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
-            if not answer_text:
-                sample_text = str(question)
-                is_russian = any(
-                    char in sample_text for char in "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
-                )
+    async def generate(self, prompt: str) -> str:
+        """Generate text from a prompt."""
+        key = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+        cached = self._prompt_cache.get(key)
+        if cached is not None:
+            self._prompt_cache.move_to_end(key)
+            logger.debug("Reusing cached LLM response for identical prompt")
+            return cached
+
+        async with self._semaphore:
+            logger.info(f"Calling Ollama at {self.base_url} with model {self.model}")
+            content = "".join([part async for part in self.generate_stream(prompt)])
+        if not content:
+            raise ValueError("Empty content in response")
+        logger.info(f"Ollama response received, length: {len(content)}")
+
+        result = content.strip()
+        self._prompt_cache[key] = result
+        if len(self._prompt_cache) > self.PROMPT_CACHE_SIZE:
+            self._prompt_cache.popitem(last=False)
+        return result
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield generated text chunks as the model decodes them."""
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a professional copywriter. /no_think",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=2000,
+                temperature=0.2,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except APITimeoutError as e:
+            logger.error(f"LLM timeout: {e}")
+            raise ValueError("LLM request timed out") from e
+        except APIError as e:
+            logger.error(f"LLM API error: {e}")
+            raise ValueError(f"LLM API error: {e!s}") from e
+        # The SDK only wraps errors raised before the stream starts; transport
+        # errors while reading chunks surface as raw httpx exceptions
+        except httpx.TimeoutException as e:
+            logger.error(f"LLM stream timeout: {e}")
+            raise ValueError("LLM request timed out") from e
+        except httpx.HTTPError as e:
+            logger.error(f"LLM stream error: {e}")
+            raise ValueError(f"LLM stream error: {e!s}") from e
+
+    async def generate_cover_letter(
+        self, vacancy: dict[str, Any], user_profile: dict[str, Any]
+    ) -> str:
+        """Generate a cover letter for a job vacancy."""
+        employer = vacancy.get("employer") or {}
+        snippet = vacancy.get("snippet") or {}
+        company = employer.get("name", "the company")
+        position = vacancy.get("name", "this position")
+        requirements = snippet.get("requirement", "")
+        responsibilities = snippet.get("responsibility", "")
+        description = _description_excerpt(vacancy.get("description") or "")
+
+        key_skills = [skill.get("name", "") for skill in vacancy.get("key_skills", [])]
 
-                if is_russian:
-                    answer_text = "Я очень заинтересован в этой возможности и считаю, что мой опыт будет ценным для этой роли."
-                else:
-                    answer_text = "I am very interested in this opportunity and believe my experience would be valuable for this role."
+        is_russian = self._has_cyrillic(requirements, responsibilities, description)
 
-            structured_answers.append({"id": question_id, "answer": answer_text})
+        candidate_name = user_profile.get("name", "Кандидат")
+        candidate_email = user_profile.get("email", "")
+
+        lang = "ru" if is_russian else "en"
+        missing = _NOT_SPECIFIED[lang]
+        template = _COVER_LETTER_PROMPT_RU if is_russian else _COVER_LETTER_PROMPT_EN
+        prompt = template.format_map(
+            {
+                "position": position,
+                "company": company,
+                "requirements": requirements,
+                "responsibilities": responsibilities,
+                "key_skills": ", ".join(key_skills)
+                if key_skills
+                else missing["skills"],
+                "description": description,
+                "candidate_name": candidate_name,
+                "candidate_email": candidate_email,
+                "experience": user_profile.get("experience", missing["experience"]),
+                "skills": user_profile.get("skills", missing["skills"]),
+                "education": user_profile.get("education", missing["education"]),
+                "position_current": user_profile.get("position", missing["position"]),
+            }
+        )
+
+        return await self.generate(prompt)
+
+    async def answer_screening_questions(
+        self,
+        questions: list[dict[str, Any]],
+        vacancy: dict[str, Any],
+        user_profile: dict[str, Any],
+    ) -> list[dict[str, str]]:
+        """Generate answers for job screening questions.
+
+        Each question gets its own prompt so the answers are generated
+        concurrently and one failure only costs that question its answer.
+        """
+        if not questions:
+            return []
+
+        vacancy_name = vacancy.get("name", "")
+        employer = vacancy.get("employer") or {}
+        # The shared prompt fields only vary with the language of the question
+        fields_by_lang = {
+            lang: {
+                "job": vacancy.get("name", missing["job"]),
+                "employer": employer.get("name", missing["employer"]),
+                "experience": user_profile.get("experience", missing["experience"]),
+                "skills": user_profile.get("skills", missing["skills"]),
+                "education": user_profile.get("education", missing["education"]),
+                "current_position": user_profile.get(
+                    "current_position", missing["position"]
+                ),
+            }
+            for lang, missing in _NOT_SPECIFIED.items()
+        }
+
+        langs = []
+        prompts = []
+        for q in questions:
+            question_text = q.get("text", q.get("question", str(q)))
+            is_russian = self._has_cyrillic(question_text, vacancy_name)
+            lang = "ru" if is_russian else "en"
+            template = _SCREENING_PROMPT_RU if is_russian else _SCREENING_PROMPT_EN
+            langs.append(lang)
+            prompts.append(
+                template.format_map({**fields_by_lang[lang], "question": question_text})
+            )
+
+        responses = await asyncio.gather(
+            *(self.generate(prompt) for prompt in prompts), return_exceptions=True
+        )
+
+        # Cancellation (a BaseException) must propagate, not become an answer
+        for response in responses:
+            if isinstance(response, BaseException) and not isinstance(
+                response, Exception
+            ):
+                raise response
+
+        structured_answers = []
+        for i, (question, lang, response) in enumerate(
+            zip(questions, langs, responses, strict=True)
+        ):
+            if isinstance(response, BaseException):
+                logger.warning(
+                    "Screening answer %d failed, using fallback: %s", i + 1, response
+                )
+                answer_text = _FALLBACK_ANSWER[lang]
+            else:
+                answer_text = response or _FALLBACK_ANSWER[lang]
+            structured_answers.append(
+                {"id": question.get("id", str(i)), "answer": answer_text}
+            )
 
         return structured_answers
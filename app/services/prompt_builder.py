@@ -8,16 +8,17 @@ from app.schemas.apply import ApplyRequest
 def build_application_prompt(req: ApplyRequest, vacancy: dict[str, Any]) -> str:
     """Build a prompt for generating cover letter and screening answers."""
     title = vacancy.get("name", "Unknown Position")
-    company = vacancy.get("employer", {}).get("name", "Unknown Employer")
+    company = (vacancy.get("employer") or {}).get("name", "Unknown Employer")
 
-    snippet_req = vacancy.get("snippet", {}).get("requirement", "")
-    snippet_resp = vacancy.get("snippet", {}).get("responsibility", "")
+    snippet = vacancy.get("snippet") or {}
+    snippet_req = snippet.get("requirement", "")
+    snippet_resp = snippet.get("responsibility", "")
 
     full_desc = vacancy.get("description", "")
     questions = vacancy.get("questions", [])
     key_skills = ", ".join(ks.get("name") for ks in vacancy.get("key_skills", []))
 
-    prompt = (
+    parts = [
         f"You are a professional career coach. "
         f'Write a concise, persuasive cover letter for the position "{title}" '
         f'at "{company}".\n\n'
@@ -28,11 +29,12 @@ def build_application_prompt(req: ApplyRequest, vacancy: dict[str, Any]) -> str:
         f"Skills: {req.skills} (from request)\n"
         f"Key skills listed in vacancy: {key_skills}\n"
         f"Experience: {req.experience}\n\n"
-    )
+    ]
 
     if questions:
-        prompt += 'Then, under the heading "Screening Answers", answer each question:\n'
-        for i, q in enumerate(questions, 1):
-            prompt += f"{i}. {q}\n"
+        parts.append(
+            'Then, under the heading "Screening Answers", answer each question:\n'
+        )
+        parts.extend(f"{i}. {q}\n" for i, q in enumerate(questions, 1))
 
-    return prompt
+    return "".join(parts)
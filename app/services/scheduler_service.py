@@ -3,6 +3,7 @@
 import asyncio
 import logging
 from datetime import UTC, datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 import httpx
@@ -31,6 +32,33 @@ def _now() -> datetime:
     return datetime.now(UTC).replace(tzinfo=None)
 
 
+_DAYS_MAP = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+
+@lru_cache(maxsize=128)
+def _parse_schedule_days(schedule_days: str) -> tuple[int, ...]:
+    """Convert a comma-separated weekday list into weekday numbers (0 = Monday)."""
+    return tuple(
+        _DAYS_MAP[day]
+        for day in (d.strip() for d in schedule_days.lower().split(","))
+        if day in _DAYS_MAP
+    )
+
+
+@lru_cache(maxsize=512)
+def _build_trigger(
+    schedule_days: str, hour: int, minute: int, timezone: str
+) -> CronTrigger:
+    """Build the cron trigger for a schedule; identical schedules share one."""
+    cron_days = ",".join(map(str, _parse_schedule_days(schedule_days)))
+    return CronTrigger(
+        hour=hour,
+        minute=minute,
+        day_of_week=cron_days or "0,1,2,3,4",  # Default to weekdays
+        timezone=timezone,
+    )
+
+
 class SchedulerService:
     """Service for managing scheduled auto-apply jobs."""
 
@@ -65,12 +93,15 @@ class SchedulerService:
         await self._cleanup_stale_runs()
 
         self._scheduler = AsyncIOScheduler(timezone=settings.scheduler_default_timezone)
-        self._scheduler.start()
+        # Start paused so loading jobs doesn't wake the scheduler once per job
+        self._scheduler.start(paused=True)
+        try:
+            if settings.scheduler_auto_start:
+                await self._load_all_user_jobs()
+        finally:
+            self._scheduler.resume()
         logger.info("Scheduler started")
 
-        if settings.scheduler_auto_start:
-            await self._load_all_user_jobs()
-
     async def _cleanup_stale_runs(self):
         """Mark any stale 'running' records as interrupted.
 
@@ -78,29 +109,22 @@ class SchedulerService:
         """
         try:
             async with async_session() as session:
-                # Find all records stuck in "running" status
-                query = select(SchedulerRunHistory).where(
-                    SchedulerRunHistory.status == "running"
+                # One UPDATE covers every record stuck in "running" status
+                result = await session.execute(
+                    update(SchedulerRunHistory)
+                    .where(SchedulerRunHistory.status == "running")
+                    .values(
+                        finished_at=_now(),
+                        status="interrupted",
+                        error_message="App restarted while job was running",
+                    )
                 )
-                result = await session.execute(query)
-                stale_runs = result.scalars().all()
+                await session.commit()
 
-                if stale_runs:
+                if result.rowcount:
                     logger.warning(
-                        f"Found {len(stale_runs)} stale 'running' records, marking as interrupted"
+                        f"Marked {result.rowcount} stale 'running' records as interrupted"
                     )
-                    for run in stale_runs:
-                        await session.execute(
-                            update(SchedulerRunHistory)
-                            .where(SchedulerRunHistory.id == run.id)
-                            .values(
-                                finished_at=_now(),
-                                status="interrupted",
-                                error_message="App restarted while job was running",
-                            )
-                        )
-                    await session.commit()
-                    logger.info(f"Cleaned up {len(stale_runs)} stale run records")
         except SQLAlchemyError as e:
             logger.error(f"Failed to cleanup stale runs: {e}")
 
@@ -133,41 +157,21 @@ class SchedulerService:
 
         job_id = f"auto_apply_{user_settings.user_id}"
 
-        # Remove existing job if any
-        existing_job = self._scheduler.get_job(job_id)
-        if existing_job:
-            self._scheduler.remove_job(job_id)
-
         if not user_settings.enabled:
+            if self._scheduler.get_job(job_id):
+                self._scheduler.remove_job(job_id)
             logger.info(f"Scheduler disabled for user {user_settings.user_id}")
             return
 
-        # Parse days
-        days_map = {
-            "mon": "0",
-            "tue": "1",
-            "wed": "2",
-            "thu": "3",
-            "fri": "4",
-            "sat": "5",
-            "sun": "6",
-        }
-        days = user_settings.schedule_days.lower().split(",")
-        cron_days = ",".join(
-            days_map.get(d.strip(), "0") for d in days if d.strip() in days_map
-        )
-
-        if not cron_days:
-            cron_days = "0,1,2,3,4"  # Default to weekdays
-
-        trigger = CronTrigger(
-            hour=user_settings.schedule_hour,
-            minute=user_settings.schedule_minute,
-            day_of_week=cron_days,
-            timezone=user_settings.timezone,
+        trigger = _build_trigger(
+            user_settings.schedule_days,
+            user_settings.schedule_hour,
+            user_settings.schedule_minute,
+            user_settings.timezone,
         )
 
-        self._scheduler.add_job(
+        # replace_existing swaps out any previous job for this user
+        job = self._scheduler.add_job(
             self._run_auto_apply,
             trigger=trigger,
             id=job_id,
@@ -177,13 +181,10 @@ class SchedulerService:
             coalesce=True,  # Run only once if multiple runs were missed
         )
 
-        # Get next run time from the scheduled job for accurate logging
-        job = self._scheduler.get_job(job_id)
-        next_run = job.next_run_time if job else None
         logger.info(
             f"Scheduled auto-apply for user {user_settings.user_id} "
             f"at {user_settings.schedule_hour}:{user_settings.schedule_minute:02d} "
-            f"on days {user_settings.schedule_days}, next run: {next_run}"
+            f"on days {user_settings.schedule_days}, next run: {job.next_run_time}"
         )
 
     async def _check_and_run_missed_job(self, user_settings: SchedulerSettings):
@@ -196,20 +197,7 @@ class SchedulerService:
         now = datetime.now(user_tz)
 
         # Check if today is a scheduled day
-        days_map = {
-            "mon": 0,
-            "tue": 1,
-            "wed": 2,
-            "thu": 3,
-            "fri": 4,
-            "sat": 5,
-            "sun": 6,
-        }
-        scheduled_days = [
-            days_map.get(d.strip().lower())
-            for d in user_settings.schedule_days.split(",")
-            if d.strip().lower() in days_map
-        ]
+        scheduled_days = _parse_schedule_days(user_settings.schedule_days)
 
         if now.weekday() not in scheduled_days:
             logger.debug(
@@ -419,12 +407,7 @@ class SchedulerService:
         """
         from app.services.application_service import ApplicationService
         from app.services.hh_client import HHClient
-        from app.services.llm.factory import get_llm_provider
-
-        # Create dependencies
-        hh_client = HHClient()
-        llm_provider = get_llm_provider()
-        service = ApplicationService(hh_client, llm_provider)
+        from app.services.llm.factory import create_llm_http_client, get_llm_provider
 
         # Build request from search criteria
         request = BulkApplyRequest(
@@ -439,37 +422,43 @@ class SchedulerService:
             use_cover_letter=search_criteria.get("use_cover_letter", True),
         )
 
-        sent = 0
-        skipped = 0
-        failed = 0
-
-        # Use streaming to get incremental progress
-        async for progress in service.bulk_apply_stream(
-            request=request,
-            max_applications=max_applications,
-            user_id=user_id,
-            cancel_check=lambda: self.is_cancel_requested(user_id),
-        ):
-            # Update counters from progress
-            if progress.success_count is not None:
-                sent = progress.success_count
-            if progress.skipped_count is not None:
-                skipped = progress.skipped_count
-            if progress.error_count is not None:
-                failed = progress.error_count
-
-            # Update database with current progress after each result
-            if progress.result and run_history_id:
-                await self._update_run_progress(run_history_id, sent, skipped, failed)
-
-            # Log progress events
-            if progress.event == "progress" and progress.result:
-                logger.debug(
-                    f"Progress: {progress.current}/{progress.total} - "
-                    f"{progress.result.status}: {progress.result.vacancy_title}"
-                )
-            elif progress.event in ["complete", "cancelled", "error"]:
-                logger.info(f"Bulk apply {progress.event}: {progress.message}")
+        # Close both pools when the run ends, however it ends
+        async with HHClient() as hh_client, create_llm_http_client() as llm_client:
+            service = ApplicationService(hh_client, get_llm_provider(llm_client))
+
+            sent = 0
+            skipped = 0
+            failed = 0
+
+            # Use streaming to get incremental progress
+            async for progress in service.bulk_apply_stream(
+                request=request,
+                max_applications=max_applications,
+                user_id=user_id,
+                cancel_check=lambda: self.is_cancel_requested(user_id),
+            ):
+                # Update counters from progress
+                if progress.success_count is not None:
+                    sent = progress.success_count
+                if progress.skipped_count is not None:
+                    skipped = progress.skipped_count
+                if progress.error_count is not None:
+                    failed = progress.error_count
+
+                # Update database with current progress after each result
+                if progress.result and run_history_id:
+                    await self._update_run_progress(
+                        run_history_id, sent, skipped, failed
+                    )
+
+                # Log progress events
+                if progress.event == "progress" and progress.result:
+                    logger.debug(
+                        f"Progress: {progress.current}/{progress.total} - "
+                        f"{progress.result.status}: {progress.result.vacancy_title}"
+                    )
+                elif progress.event in ["complete", "cancelled", "error"]:
+                    logger.info(f"Bulk apply {progress.event}: {progress.message}")
 
         return sent, skipped, failed
 
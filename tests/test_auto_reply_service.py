@@ -0,0 +1,275 @@
+"""Tests for AutoReplyService scheduling and bookkeeping."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.storage import Base
+from app.models.scheduler import AutoReplyHistory, AutoReplySettings
+from app.services.auto_reply_service import AutoReplyService, _message_hash, _now
+from app.services.hh_client import HHAPIError
+
+
+@pytest.fixture
+async def session_factory(monkeypatch):
+    """Point the service at a fresh in-memory database."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr("app.services.auto_reply_service.async_session", factory)
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def service(session_factory):
+    """The shared service instance with its per-user state cleared."""
+    service = AutoReplyService()
+    service._last_started.clear()
+    service._failures.clear()
+    service._backoff_until.clear()
+    service._user_locks.clear()
+    yield service
+    service._last_started.clear()
+    service._failures.clear()
+    service._backoff_until.clear()
+    service._user_locks.clear()
+
+
+async def _add_settings(session_factory, user_id: str, **values) -> None:
+    """Store an always-active settings row for a user."""
+    values = {
+        "enabled": True,
+        "check_interval_minutes": 60,
+        "timezone": "UTC",
+        "active_hours_start": 0,
+        "active_hours_end": 24,
+        "active_days_mask": 127,
+        **values,
+    }
+    async with session_factory() as session:
+        session.add(AutoReplySettings(user_id=user_id, **values))
+        await session.commit()
+
+
+class TestTick:
+    """Tests for picking the users due for a check."""
+
+    async def test_runs_only_due_users(self, service, session_factory, monkeypatch):
+        """Test interval, last start, backoff and enabled flag gate a check."""
+        now = _now()
+        stale = now - timedelta(hours=2)
+        await _add_settings(session_factory, "never_checked")
+        await _add_settings(session_factory, "stale", last_check_at=stale)
+        await _add_settings(session_factory, "fresh", last_check_at=now)
+        await _add_settings(session_factory, "started", last_check_at=stale)
+        await _add_settings(session_factory, "backing_off", last_check_at=stale)
+        await _add_settings(session_factory, "disabled", enabled=False)
+        service._last_started["started"] = now
+        service._backoff_until["backing_off"] = now + timedelta(minutes=5)
+        run = AsyncMock()
+        monkeypatch.setattr(service, "_run_auto_reply_check", run)
+
+        await service._tick()
+
+        assert sorted(call.args[0] for call in run.await_args_list) == [
+            "never_checked",
+            "stale",
+        ]
+        assert service._enabled_users == 5
+
+    async def test_expired_backoff_allows_check(
+        self, service, session_factory, monkeypatch
+    ):
+        """Test a user is checked again once the backoff has passed."""
+        await _add_settings(session_factory, "user_001")
+        service._backoff_until["user_001"] = _now() - timedelta(seconds=1)
+        run = AsyncMock()
+        monkeypatch.setattr(service, "_run_auto_reply_check", run)
+
+        await service._tick()
+
+        run.assert_awaited_once_with("user_001")
+
+    async def test_status_counts_users_before_first_tick(
+        self, service, session_factory
+    ):
+        """Test the enabled user count is known as soon as the service starts."""
+        await _add_settings(session_factory, "user_001")
+        await _add_settings(session_factory, "user_002")
+        await _add_settings(session_factory, "user_003", enabled=False)
+
+        await service.start()
+        try:
+            assert service.get_status() == {
+                "scheduler_running": True,
+                "jobs_count": 2,
+            }
+        finally:
+            await service.stop()
+
+        assert service.get_status()["scheduler_running"] is False
+
+
+class TestBackoff:
+    """Tests for backing off after failed checks."""
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            HHAPIError(429, "Too many requests"),
+            HHAPIError(503, "Service unavailable"),
+            httpx.ConnectError("Connection refused"),
+            HTTPException(status_code=401, detail="No valid token"),
+            KeyError("employer"),
+        ],
+    )
+    async def test_transient_errors_back_off(
+        self, service, session_factory, monkeypatch, error
+    ):
+        """Test rate limits, outages, auth and unexpected errors back off."""
+        await _add_settings(session_factory, "user_001")
+        monkeypatch.setattr(
+            service, "_process_unread_messages", AsyncMock(side_effect=error)
+        )
+
+        await service._do_auto_reply_check("user_001")
+        first_until = service._backoff_until["user_001"]
+        await service._do_auto_reply_check("user_001")
+
+        assert service._failures["user_001"] == 2
+        assert first_until > _now()
+
+    @pytest.mark.parametrize(
+        "error", [HHAPIError(400, "Bad request"), ValueError("Bad reply")]
+    )
+    async def test_other_errors_do_not_back_off(
+        self, service, session_factory, monkeypatch, error
+    ):
+        """Test client and validation errors are only logged."""
+        await _add_settings(session_factory, "user_001")
+        monkeypatch.setattr(
+            service, "_process_unread_messages", AsyncMock(side_effect=error)
+        )
+
+        await service._do_auto_reply_check("user_001")
+
+        assert "user_001" not in service._failures
+        assert "user_001" not in service._backoff_until
+
+    async def test_success_resets_backoff(self, service, session_factory, monkeypatch):
+        """Test a successful check clears failures and records statistics."""
+        await _add_settings(session_factory, "user_001")
+        service._failures["user_001"] = 3
+        service._backoff_until["user_001"] = _now() - timedelta(seconds=1)
+        monkeypatch.setattr(
+            service, "_process_unread_messages", AsyncMock(return_value=(2, 1))
+        )
+
+        await service._do_auto_reply_check("user_001")
+
+        assert "user_001" not in service._failures
+        assert "user_001" not in service._backoff_until
+        async with session_factory() as session:
+            row = await session.scalar(select(AutoReplySettings))
+        assert row.last_check_at is not None
+        assert (row.total_messages_processed, row.total_replies_sent) == (2, 1)
+
+    def test_backoff_grows_and_is_capped(self, service):
+        """Test the delay doubles per failure up to the maximum."""
+        delays = [service._schedule_backoff("user_001") for _ in range(10)]
+
+        assert 30 <= delays[0] <= 60
+        assert 60 <= delays[1] <= 120
+        assert all(delay <= 3600 for delay in delays)
+        assert delays[-1] >= 1800
+
+
+class TestUserLock:
+    """Tests for serializing checks per user."""
+
+    async def test_overlapping_checks_are_skipped(self, service, monkeypatch):
+        """Test a second check for a busy user neither runs nor waits."""
+        release = asyncio.Event()
+
+        async def _slow_check(user_id):
+            if user_id == "user_001":
+                await release.wait()
+
+        check = AsyncMock(side_effect=_slow_check)
+        monkeypatch.setattr(service, "_do_auto_reply_check", check)
+
+        first = asyncio.create_task(service._run_auto_reply_check("user_001"))
+        await asyncio.sleep(0)
+        await service._run_auto_reply_check("user_001")
+        manual = await service.trigger_manual_check("user_001")
+        await service._run_auto_reply_check("user_002")
+        release.set()
+        await first
+
+        assert manual["status"] == "error"
+        assert [call.args[0] for call in check.await_args_list] == [
+            "user_001",
+            "user_002",
+        ]
+        assert "user_001" in service._last_started
+
+
+class TestReplyHistory:
+    """Tests for deduplicating replies by employer message."""
+
+    async def test_duplicate_reply_is_rejected(self, service, session_factory):
+        """Test the unique index keeps one reply per negotiation message."""
+        message_hash = _message_hash("When can you start?")
+        reply = {
+            "user_id": "user_001",
+            "negotiation_id": "neg_1",
+            "vacancy_id": "vac_1",
+            "employer_message": "When can you start?",
+            "employer_message_hash": message_hash,
+            "generated_reply": "Next week.",
+            "was_sent": True,
+            "employer_name": "Test Company",
+            "vacancy_title": "Python Developer",
+        }
+
+        assert not await service._already_replied("neg_1", message_hash)
+        await service._save_reply_history(**reply)
+        await service._save_reply_history(**reply)
+        await service._save_reply_history(**{**reply, "negotiation_id": "neg_2"})
+
+        assert await service._already_replied("neg_1", message_hash)
+        async with session_factory() as session:
+            rows = (await session.scalars(select(AutoReplyHistory))).all()
+        assert sorted(row.negotiation_id for row in rows) == ["neg_1", "neg_2"]
+
+
+class TestSettings:
+    """Tests for settings updates and status."""
+
+    async def test_active_days_sync_mask(self, service, session_factory):
+        """Test active days keep the bitmask in step on create and update."""
+        service._last_started["user_001"] = _now()
+
+        created = await service.update_user_settings(
+            "user_001", True, active_days="mon,wed"
+        )
+        assert created.active_days_mask == 0b101
+        assert "user_001" not in service._last_started
+
+        updated = await service.update_user_settings(
+            "user_001", True, active_days="sat,sun"
+        )
+        assert updated.active_days_mask == 0b1100000
+
+        unchanged = await service.update_user_settings("user_001", False)
+        assert unchanged.active_days_mask == 0b1100000
@@ -1,10 +1,30 @@
 """Tests for HH client functionality."""
 
+import asyncio
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
-
-from app.services.hh_client import HHAPIError, HHClient
+from fastapi import HTTPException
+
+from app.models.token import Token
+from app.services.hh_client import (
+    HHAPIError,
+    HHClient,
+    _backoff_delay,
+    _error_body,
+    _is_ddos_challenge,
+    _parse_retry_after,
+    _reference_cache,
+    _token_cache,
+    _TokenBucket,
+    _TTLCache,
+    create_http_client,
+    get_hh_client,
+)
 
 
 class TestHHAPIError:
@@ -32,6 +52,55 @@ class TestHHAPIError:
         assert error.response_data == {}
 
 
+class TestTTLCache:
+    """Tests for the in-memory TTL cache."""
+
+    def test_get_returns_stored_value(self):
+        """Test stored values are returned before expiry."""
+        cache = _TTLCache(ttl=60, maxsize=2)
+        cache.set("a", {"id": "a"})
+        assert cache.get("a") == {"id": "a"}
+        assert cache.get("missing") is None
+
+    def test_expired_entries_are_dropped(self):
+        """Test entries past their TTL are treated as missing."""
+        cache = _TTLCache(ttl=60, maxsize=2)
+        with patch("app.services.hh_client.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("app.services.hh_client.time.monotonic", return_value=161.0):
+            assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted when full."""
+        cache = _TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+class TestTokenBucket:
+    """Tests for the request rate limiter."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_throttle(self):
+        """Test bursts pass immediately and excess requests wait."""
+        with patch("app.services.hh_client.time.monotonic", return_value=0.0):
+            bucket = _TokenBucket(rate=10, capacity=2)
+            with patch(
+                "app.services.hh_client.asyncio.sleep", new_callable=AsyncMock
+            ) as mock_sleep:
+                await bucket.acquire()
+                await bucket.acquire()
+                mock_sleep.assert_not_called()
+
+                await bucket.acquire()
+                mock_sleep.assert_awaited_once_with(pytest.approx(0.1))
+
+
 class TestHHClient:
     """Tests for HHClient class."""
 
@@ -57,6 +126,77 @@ class TestHHClient:
         # Should not raise any errors
 
 
+class TestBackoffDelay:
+    """Tests for retry backoff delays."""
+
+    def test_delay_within_doubling_window(self):
+        """Test each attempt draws from a window that doubles."""
+        for attempt in (1, 2, 3):
+            assert 0 <= _backoff_delay(0.5, attempt) <= 0.5 * 2 ** (attempt - 1)
+
+    def test_delay_is_capped(self):
+        """Test large attempt counts never exceed the cap."""
+        with patch("app.services.hh_client.random.uniform", side_effect=max):
+            assert _backoff_delay(0.5, 50) == 30.0
+
+    def test_custom_cap(self):
+        """Test a caller-supplied cap replaces the default one."""
+        with patch("app.services.hh_client.random.uniform", side_effect=max):
+            assert _backoff_delay(90.0, 2, 600.0) == 180.0
+            assert _backoff_delay(90.0, 5, 600.0) == 600.0
+
+
+class TestParseRetryAfter:
+    """Tests for Retry-After header parsing."""
+
+    def test_seconds(self):
+        """Test an integer header is read as seconds."""
+        assert _parse_retry_after("15") == 15.0
+
+    def test_http_date(self):
+        """Test an HTTP-date header is converted to a delay."""
+        retry_at = datetime.now(UTC) + timedelta(seconds=90)
+        delay = _parse_retry_after(format_datetime(retry_at, usegmt=True))
+        assert 85 <= delay <= 90
+
+    def test_past_date_is_zero(self):
+        """Test a date in the past means retry immediately."""
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    @pytest.mark.parametrize("value", [None, "", "soon"])
+    def test_missing_or_invalid(self, value):
+        """Test absent or malformed headers fall back to backoff."""
+        assert _parse_retry_after(value) is None
+
+
+class TestGetHHClient:
+    """Tests for the shared HH client dependency."""
+
+    @pytest.mark.asyncio
+    async def test_returns_shared_instance(self):
+        """Test dependency reuses the client stored on app state."""
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+
+        first = await get_hh_client(request)
+        second = await get_hh_client(request)
+
+        assert first is second
+        assert request.app.state.hh_client is first
+        await first.close()
+
+    @pytest.mark.asyncio
+    async def test_injected_client_is_not_closed(self):
+        """Test close() leaves a shared HTTP client to its owner."""
+        http_client = create_http_client()
+        client = HHClient(http_client)
+
+        await client.close()
+
+        assert client.client is http_client
+        assert not http_client.is_closed
+        await http_client.aclose()
+
+
 class TestHHClientMethods:
     """Tests for HHClient methods with mocking."""
 
@@ -94,6 +234,93 @@ class TestHHClientMethods:
         assert params["salary"] == 100000
         assert params["currency"] == "RUR"
 
+    @pytest.mark.asyncio
+    async def test_search_vacancies_omits_unset_params(self, mock_client):
+        """Test search_vacancies only sends filters that were provided."""
+        with patch.object(
+            mock_client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            await mock_client.search_vacancies(
+                text="Python", salary=100000, only_with_salary=True, per_page=150
+            )
+
+        mock_request.assert_awaited_once_with(
+            "GET",
+            "/vacancies",
+            params={
+                "page": 0,
+                "per_page": 100,
+                "text": "Python",
+                "salary": 100000,
+                "currency": "RUR",
+                "only_with_salary": "true",
+            },
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_applied_vacancy_ids_fetches_all_pages(self, mock_client):
+        """Test applied IDs are collected from every negotiations page."""
+
+        async def fake_request(method, endpoint, params):
+            page = params["page"]
+            return {
+                "pages": 3,
+                "items": [{"vacancy": {"id": page + 1}}, {"vacancy": None}],
+            }
+
+        with patch.object(mock_client, "_make_request", side_effect=fake_request):
+            applied = await mock_client.get_applied_vacancy_ids()
+
+        assert applied == {"1", "2", "3"}
+
+    @pytest.mark.asyncio
+    async def test_user_profile_picks_first_contacts(self, mock_client):
+        """Test profile contacts take the first phone and email."""
+        resume = {
+            "id": "r1",
+            "contact": [
+                None,
+                {"type": {"id": "email"}, "value": "a@example.com"},
+                {"type": {"id": "cell"}, "value": "+70000000000"},
+                {"type": {"id": "email"}, "value": "b@example.com"},
+            ],
+        }
+        with (
+            patch.object(
+                mock_client, "get_user_info", AsyncMock(return_value={"id": "u1"})
+            ),
+            patch.object(
+                mock_client,
+                "get_user_resumes",
+                AsyncMock(return_value=[{"id": "r1"}]),
+            ),
+            patch.object(
+                mock_client,
+                "get_resume_details_by_token",
+                AsyncMock(return_value=resume),
+            ),
+        ):
+            profile = await mock_client.get_user_profile_for_application("token")
+
+        assert profile["contacts"] == {
+            "phone": "+70000000000",
+            "email": "a@example.com",
+        }
+
+    @pytest.mark.asyncio
+    async def test_search_vacancies_keeps_falsy_ids(self, mock_client):
+        """Test an explicit area 0 is sent rather than dropped."""
+        with patch.object(
+            mock_client, "_make_request", new_callable=AsyncMock
+        ) as mock_request:
+            await mock_client.search_vacancies(area=0)
+
+        assert mock_request.await_args.kwargs["params"] == {
+            "page": 0,
+            "per_page": 20,
+            "area": 0,
+        }
+
     def test_per_page_limit(self):
         """Test that per_page is limited to 100."""
         per_page = min(150, 100)
@@ -105,6 +332,325 @@ class TestHHClientMethods:
         assert per_page == 50
 
 
+class TestMakeRequestRetries:
+    """Tests for _make_request retry and backoff behaviour."""
+
+    @pytest.fixture
+    def make_client(self):
+        """Build an HHClient whose transport replays the given responses."""
+
+        def _make(*responses: httpx.Response) -> tuple[HHClient, list[str]]:
+            queue = list(responses)
+            seen: list[str] = []
+
+            def handler(request: httpx.Request) -> httpx.Response:
+                seen.append(request.method)
+                return queue.pop(0)
+
+            client = HHClient()
+            client.client = httpx.AsyncClient(
+                base_url=HHClient.API_BASE, transport=httpx.MockTransport(handler)
+            )
+            client._cookies_initialized = True
+            return client, seen
+
+        with (
+            patch.object(HHClient, "_ensure_token", new_callable=AsyncMock),
+            patch.object(HHClient, "_rate_limit", new_callable=AsyncMock),
+            patch("app.services.hh_client.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            yield _make
+
+    @pytest.mark.asyncio
+    async def test_endpoints_return_parsed_bodies(self, make_client):
+        """Test wrappers return the dict _make_request already decoded."""
+        client, _ = make_client(
+            httpx.Response(200, json={"items": [], "pages": 0}),
+            httpx.Response(201, json={"id": "n1"}),
+        )
+
+        with patch.object(client, "_warm_up_vacancy_page", new_callable=AsyncMock):
+            assert await client.get_my_applications() == {"items": [], "pages": 0}
+            assert await client.apply("v1", "r1") == {"id": "n1"}
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_retries_server_error(self, make_client):
+        """Test idempotent requests are retried after a 5xx."""
+        client, seen = make_client(
+            httpx.Response(502), httpx.Response(200, json={"id": "1"})
+        )
+        assert await client._make_request("GET", "/vacancies/1") == {"id": "1"}
+        assert seen == ["GET", "GET"]
+
+    @pytest.mark.asyncio
+    async def test_server_error_honours_retry_after(self, make_client):
+        """Test a 503 Retry-After header sets the retry delay."""
+        client, seen = make_client(
+            httpx.Response(503, headers={"Retry-After": "7"}),
+            httpx.Response(200, json={"id": "1"}),
+        )
+        assert await client._make_request("GET", "/vacancies/1") == {"id": "1"}
+        assert seen == ["GET", "GET"]
+        asyncio.sleep.assert_awaited_with(7.0)
+
+    @pytest.mark.asyncio
+    async def test_json_rate_limit_through_edge_honours_retry_after(self, make_client):
+        """Test a JSON 429 relayed by DDoS-Guard waits for Retry-After only."""
+        client, seen = make_client(
+            httpx.Response(
+                429,
+                headers={"server": "ddos-guard", "Retry-After": "5"},
+                json={"errors": [{"type": "too_many_requests"}]},
+            ),
+            httpx.Response(200, json={"id": "1"}),
+        )
+        assert await client._make_request("GET", "/vacancies/1") == {"id": "1"}
+        assert seen == ["GET", "GET"]
+        asyncio.sleep.assert_awaited_once_with(5.0)
+
+    @pytest.mark.asyncio
+    async def test_ddos_challenge_uses_long_jittered_backoff(self, make_client):
+        """Test a challenge page is retried after a full-jitter DDoS delay."""
+        client, seen = make_client(
+            httpx.Response(
+                403,
+                headers={"content-type": "text/html", "server": "ddos-guard"},
+                content=b"<html>Checking your browser</html>",
+            ),
+            httpx.Response(200, json={"id": "1"}),
+        )
+        with patch("app.services.hh_client.random.uniform", side_effect=max):
+            assert await client._make_request("GET", "/vacancies/1") == {"id": "1"}
+        assert seen == ["GET", "GET"]
+        asyncio.sleep.assert_awaited_once_with(90.0)
+
+    @pytest.mark.asyncio
+    async def test_post_not_retried_on_ambiguous_server_error(self, make_client):
+        """Test POST isn't resent after a 502 that may have been processed."""
+        client, seen = make_client(httpx.Response(502, json={"errors": []}))
+        with pytest.raises(HHAPIError) as exc_info:
+            await client._make_request("POST", "/negotiations")
+        assert exc_info.value.status_code == 502
+        assert seen == ["POST"]
+
+    @pytest.mark.asyncio
+    async def test_reference_data_revalidated_with_etag(self, make_client):
+        """Test expired reference data is revalidated and reused on 304."""
+        client, seen = make_client(
+            httpx.Response(200, json=[{"id": "1"}], headers={"ETag": '"v1"'}),
+            httpx.Response(304),
+        )
+        with patch.dict("app.services.hh_client._reference_etags", clear=True):
+            assert await client.get_areas() == [{"id": "1"}]
+            _reference_cache.clear()  # Simulate TTL expiry
+            assert await client.get_areas() == [{"id": "1"}]
+        _reference_cache.clear()
+        assert len(seen) == 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_retries_are_bounded(self, make_client):
+        """Test repeated 429s eventually raise instead of looping forever."""
+        client, seen = make_client(*(httpx.Response(429) for _ in range(4)))
+        with pytest.raises(HHAPIError) as exc_info:
+            await client._make_request("GET", "/vacancies", max_retries=3)
+        assert exc_info.value.status_code == 429
+        assert len(seen) == 4
+
+
+class TestTokenRefresh:
+    """Tests for proactive token refresh."""
+
+    @staticmethod
+    def _token(access_token: str, age_seconds: int) -> Token:
+        return Token(
+            access_token=access_token,
+            refresh_token="refresh",
+            expires_in=3600,
+            obtained_at=datetime.now(UTC).replace(tzinfo=None)
+            - timedelta(seconds=age_seconds),
+        )
+
+    @pytest.fixture(autouse=True)
+    def clear_token_cache(self):
+        """Start each test without a token cached by another client."""
+        _token_cache.update(token=None, expires_at=0.0)
+        yield
+        _token_cache.update(token=None, expires_at=0.0)
+
+    @pytest.mark.asyncio
+    async def test_fresh_token_is_cached_without_refresh(self):
+        """Test a token far from expiry is cached and not refreshed."""
+        client = HHClient()
+        token = self._token("fresh", age_seconds=60)
+        with (
+            patch("app.services.hh_client.TokenStorage") as mock_storage,
+            patch.object(
+                client, "refresh_token", new_callable=AsyncMock
+            ) as mock_refresh,
+        ):
+            mock_storage.get_latest = AsyncMock(return_value=token)
+            assert await client.refresh_stored_token() is token
+
+        mock_refresh.assert_not_awaited()
+        assert client._auth_header == "Bearer fresh"
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_expiring_token_is_refreshed_and_saved(self):
+        """Test a token inside the refresh margin is exchanged and stored."""
+        client = HHClient()
+        old = self._token("old", age_seconds=3300)
+        new = self._token("new", age_seconds=0)
+        with (
+            patch("app.services.hh_client.TokenStorage") as mock_storage,
+            patch.object(
+                client, "refresh_token", new_callable=AsyncMock
+            ) as mock_refresh,
+        ):
+            mock_storage.get_latest = AsyncMock(return_value=old)
+            mock_storage.save = AsyncMock(return_value=new)
+            mock_refresh.return_value = {
+                "access_token": "new",
+                "refresh_token": "refresh",
+                "expires_in": 3600,
+                "obtained_at": new.obtained_at,
+                "token_type": "bearer",
+            }
+            assert await client.refresh_stored_token() is new
+
+        mock_refresh.assert_awaited_once_with("refresh")
+        assert "token_type" not in mock_storage.save.await_args.args[0]
+        assert client._auth_header == "Bearer new"
+        await client.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("status_code", "refresh_calls"), [(400, 1), (502, 2)])
+    async def test_rejected_refresh_token_not_retried(self, status_code, refresh_calls):
+        """Test a refresh token HH rejected is skipped, unlike transient errors."""
+        client = HHClient()
+        old = self._token("old", age_seconds=3300)
+        with (
+            patch("app.services.hh_client.TokenStorage") as mock_storage,
+            patch.object(
+                client,
+                "refresh_token",
+                new_callable=AsyncMock,
+                side_effect=HTTPException(status_code=status_code, detail="failed"),
+            ) as mock_refresh,
+        ):
+            mock_storage.get_latest = AsyncMock(return_value=old)
+            with pytest.raises(HTTPException):
+                await client.refresh_stored_token()
+            if refresh_calls == 1:
+                assert await client.refresh_stored_token() is old
+            else:
+                with pytest.raises(HTTPException):
+                    await client.refresh_stored_token()
+
+        assert mock_refresh.await_count == refresh_calls
+        await client.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("hh_status", "status_code"), [(400, 400), (503, 502)])
+    async def test_refresh_token_error_statuses(self, hh_status, status_code):
+        """Test token endpoint outages are told apart from rejected tokens."""
+        client = HHClient()
+        client.client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(hh_status, json={"error": "x"})
+            )
+        )
+        with pytest.raises(HTTPException) as exc_info:
+            await client.refresh_token("refresh")
+        assert exc_info.value.status_code == status_code
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_new_client_reuses_cached_token(self):
+        """Test a fresh client picks up a cached token without storage I/O."""
+        first = HHClient()
+        with patch("app.services.hh_client.TokenStorage") as mock_storage:
+            mock_storage.get_latest = AsyncMock(
+                return_value=self._token("shared", age_seconds=60)
+            )
+            await first._ensure_token()
+
+            second = HHClient()
+            await second._ensure_token()
+
+        mock_storage.get_latest.assert_awaited_once()
+        assert second._auth_header == "Bearer shared"
+        await first.close()
+        await second.close()
+
+
+class TestDDoSChallenge:
+    """Tests for DDoS-Guard challenge detection."""
+
+    def test_challenge_page_detected(self):
+        """Test a 403 HTML challenge page is recognised."""
+        response = httpx.Response(
+            403,
+            headers={"content-type": "text/html"},
+            content=b"<html>Checking your browser before accessing</html>",
+        )
+        assert _is_ddos_challenge(response)
+
+    def test_server_header_detected(self):
+        """Test the DDoS-Guard server header alone is enough on a 503."""
+        response = httpx.Response(503, headers={"server": "ddos-guard"})
+        assert _is_ddos_challenge(response)
+
+    def test_html_success_page_scanned(self):
+        """Test a 200 HTML challenge page is recognised."""
+        response = httpx.Response(
+            200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            content=b"<html>DDoS-Guard</html>",
+        )
+        assert _is_ddos_challenge(response)
+
+    def test_json_success_not_scanned(self):
+        """Test successful JSON responses are never treated as challenges."""
+        response = httpx.Response(
+            200,
+            headers={"server": "ddos-guard"},
+            json={"text": "checking your browser"},
+        )
+        assert not _is_ddos_challenge(response)
+
+    def test_json_error_not_challenge(self):
+        """Test a JSON 403 from the API is a regular error."""
+        response = httpx.Response(403, json={"errors": [{"type": "forbidden"}]})
+        assert not _is_ddos_challenge(response)
+
+    def test_json_error_through_edge_not_challenge(self):
+        """Test a JSON 403 relayed by the DDoS-Guard edge is a regular error."""
+        response = httpx.Response(
+            403,
+            headers={"server": "ddos-guard"},
+            json={"errors": [{"type": "negotiations", "value": "test_required"}]},
+        )
+        assert not _is_ddos_challenge(response)
+
+
+class TestErrorBody:
+    """Tests for decoding HH error responses."""
+
+    def test_json_body(self):
+        """Test JSON error bodies are returned as-is."""
+        response = httpx.Response(400, json={"errors": [{"type": "bad"}]})
+        assert _error_body(response) == {"errors": [{"type": "bad"}]}
+
+    def test_non_json_body(self):
+        """Test non-JSON bodies fall back to a truncated message."""
+        response = httpx.Response(400, content=b"\xff<html>" + b"x" * 1000)
+        message = _error_body(response)["message"]
+        assert message.startswith("\ufffd<html>")
+        assert len(message) == 512
+
+
 class TestApplyValidation:
     """Tests for apply method validation."""
 
@@ -1,10 +1,19 @@
 """Tests for LLM providers and related functionality."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
 
 from app.services.llm.base import LLMProvider
 from app.services.llm.dependencies import enhanced_llm_dep, llm_provider_dep
 from app.services.llm.factory import get_llm_provider
+from app.services.llm.providers import (
+    OllamaProvider,
+    _description_excerpt,
+    _html_to_text,
+)
 
 
 class TestLLMProvider:
@@ -16,6 +25,230 @@ class TestLLMProvider:
         # but we can test that subclasses need to implement methods
         assert hasattr(LLMProvider, "generate_cover_letter")
         assert hasattr(LLMProvider, "answer_screening_questions")
+        assert "generate" in LLMProvider.__abstractmethods__
+
+    def test_detect_language(self):
+        """Test Cyrillic-heavy text is detected as Russian."""
+        detect = LLMProvider._detect_language
+        assert detect("Требуется Python разработчик") == "ru"
+        assert detect("Python developer needed") == "en"
+        assert detect("") == "en"
+
+    def test_has_cyrillic(self):
+        """Test Cyrillic detection across several optional texts."""
+        assert LLMProvider._has_cyrillic("Python", None, "Разработчик")
+        assert not LLMProvider._has_cyrillic("Python", None, "")
+
+
+class TestOllamaProvider:
+    """Tests for the Ollama provider."""
+
+    @staticmethod
+    def _stream_create(*parts: str) -> AsyncMock:
+        """Build a completions.create mock returning a chunk stream."""
+
+        async def stream():
+            for part in parts:
+                chunk = MagicMock()
+                chunk.choices = [MagicMock()]
+                chunk.choices[0].delta.content = part
+                yield chunk
+
+        return AsyncMock(side_effect=lambda **kwargs: stream())
+
+    @pytest.mark.asyncio
+    async def test_generate_stream_yields_chunks(self):
+        """Test generate_stream yields deltas from the streaming API."""
+        provider = OllamaProvider()
+        create = self._stream_create("Dear ", "", "Hiring Manager")
+
+        with patch.object(provider.client.chat.completions, "create", create):
+            parts = [part async for part in provider.generate_stream("prompt")]
+
+        assert parts == ["Dear ", "Hiring Manager"]
+        assert create.await_args.kwargs["stream"] is True
+
+    async def test_generate_joins_stream(self):
+        """Test generate returns the stripped, joined stream."""
+        provider = OllamaProvider()
+        create = self._stream_create("  Hel", "lo  ")
+
+        with patch.object(provider.client.chat.completions, "create", create):
+            result = await provider.generate("prompt")
+
+        assert result == "Hello"
+        create.assert_awaited_once()
+
+    async def test_generate_rejects_empty_stream(self):
+        """Test an empty stream is reported as an LLM failure."""
+        provider = OllamaProvider()
+
+        with patch.object(
+            provider.client.chat.completions, "create", self._stream_create()
+        ):
+            with pytest.raises(ValueError, match="Empty content"):
+                await provider.generate("prompt")
+
+    async def test_generate_wraps_mid_stream_transport_errors(self):
+        """Test a read timeout while streaming surfaces as ValueError."""
+
+        class StallingStream(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                yield (
+                    b'data: {"id": "1", "object": "chat.completion.chunk", '
+                    b'"created": 0, "model": "m", "choices": [{"index": 0, '
+                    b'"delta": {"content": "Hi"}, "finish_reason": null}]}\n\n'
+                )
+                raise httpx.ReadTimeout("stalled")
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                stream=StallingStream(),
+            )
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ) as http_client:
+            provider = OllamaProvider(http_client=http_client, max_retries=0)
+            with pytest.raises(ValueError, match="timed out"):
+                await provider.generate("prompt")
+
+    async def test_generate_reuses_identical_prompt(self):
+        """Test an identical prompt is answered from the cache."""
+        provider = OllamaProvider()
+        create = self._stream_create("Letter")
+
+        with patch.object(provider.client.chat.completions, "create", create):
+            assert await provider.generate("prompt") == "Letter"
+            assert await provider.generate("prompt") == "Letter"
+            await provider.generate("other prompt")
+
+        assert create.await_count == 2
+
+    async def test_generate_caps_concurrent_requests(self):
+        """Test in-flight model calls never exceed max_concurrency."""
+        provider = OllamaProvider(max_concurrency=2)
+        in_flight = peak = 0
+
+        async def stream(prompt: str):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            yield prompt
+
+        with patch.object(provider, "generate_stream", stream):
+            await asyncio.gather(*(provider.generate(f"p{i}") for i in range(5)))
+
+        assert peak == 2
+
+    async def test_cover_letter_tolerates_null_vacancy_sections(self):
+        """Test null employer/snippet fields fall back instead of raising."""
+        provider = OllamaProvider()
+        vacancy = {"name": "Python Developer", "employer": None, "snippet": None}
+
+        with patch.object(
+            provider, "generate", AsyncMock(return_value="Letter")
+        ) as gen:
+            assert await provider.generate_cover_letter(vacancy, {}) == "Letter"
+
+        assert "COMPANY: the company" in gen.await_args.args[0]
+
+    async def test_cover_letter_strips_only_description_head(self):
+        """Test long HTML descriptions are stripped and cut to the excerpt."""
+        provider = OllamaProvider()
+        vacancy = {"name": "Dev", "description": "<p>word</p>" * 5000}
+
+        with patch.object(provider, "generate", AsyncMock(return_value="Letter")):
+            with patch(
+                "app.services.llm.providers._html_to_text", wraps=_html_to_text
+            ) as strip:
+                await provider.generate_cover_letter(vacancy, {})
+
+        assert len(strip.call_args.args[0]) <= 3200
+
+    async def test_screening_questions_answered_independently(self):
+        """Test each question gets its own call and failures fall back."""
+        provider = OllamaProvider()
+        questions = [
+            {"id": "q1", "text": "Can you relocate?"},
+            {"id": "q2", "text": "Salary expectation?"},
+        ]
+
+        async def generate(prompt: str) -> str:
+            if "relocate" in prompt:
+                return "Yes, I can relocate."
+            raise ValueError("LLM request timed out")
+
+        with patch.object(provider, "generate", side_effect=generate) as mock_gen:
+            answers = await provider.answer_screening_questions(
+                questions, {"name": "Python Developer"}, {}
+            )
+
+        assert mock_gen.call_count == 2
+        assert answers[0] == {"id": "q1", "answer": "Yes, I can relocate."}
+        assert answers[1]["id"] == "q2"
+        assert answers[1]["answer"].startswith("I am very interested")
+
+    async def test_screening_cancellation_propagates(self):
+        """Test a cancelled answer call isn't turned into an answer."""
+        provider = OllamaProvider()
+        questions = [{"id": "q1", "text": "Can you relocate?"}]
+
+        with (
+            patch.object(provider, "generate", side_effect=asyncio.CancelledError()),
+            pytest.raises(asyncio.CancelledError),
+        ):
+            await provider.answer_screening_questions(
+                questions, {"name": "Python Developer"}, {}
+            )
+
+
+class TestHtmlToText:
+    """Tests for vacancy description HTML stripping."""
+
+    def test_strips_markup_and_unescapes(self):
+        """Test tags become spaces and entities are decoded."""
+        html = "<p>Python&nbsp;&amp; SQL</p><ul><li>FastAPI</li><li>Redis</li></ul>"
+        assert _html_to_text(html) == "Python & SQL FastAPI Redis"
+
+    def test_drops_comments_scripts_and_quoted_brackets(self):
+        """Test non-text markup is removed entirely."""
+        html = (
+            '<!-- hidden --><script>var a = "<b>";</script>'
+            '<a title="x > y" href="#">Apply</a><style>p{}</style>'
+        )
+        assert _html_to_text(html) == "Apply"
+
+
+class TestDescriptionExcerpt:
+    """Tests for trimming descriptions cut through by the head slice."""
+
+    def test_drops_tag_cut_by_slice(self):
+        """Test a tag truncated mid-attribute doesn't leak into the excerpt."""
+        padding = "<p>" + "a" * 3180 + "</p>"
+        description = padding + '<p class="intro" title="x > y">Tail</p>'
+
+        excerpt = _description_excerpt(description)
+
+        assert "<" not in excerpt
+        assert "class=" not in excerpt
+        assert "title=" not in excerpt
+
+    def test_drops_unclosed_script_and_style(self):
+        """Test script/style blocks left open by the slice are removed."""
+        assert _description_excerpt("<p>Intro</p><script>var x = 1;") == "Intro"
+        assert _description_excerpt("<p>Intro</p><style>p { color: red") == "Intro"
+        assert _description_excerpt("<p>Intro</p><!-- note") == "Intro"
+
+    def test_keeps_complete_markup_text(self):
+        """Test fully closed markup still yields all of its text."""
+        html = "<p>One</p><script>x()</script><p>Two</p>"
+        assert _description_excerpt(html) == "One Two"
+        assert _description_excerpt("Plain text") == "Plain text"
 
 
 class TestGetLLMProvider:
@@ -27,10 +260,13 @@ class TestGetLLMProvider:
             mock_settings.llm_provider = "ollama"
             mock_settings.ollama_base_url = "http://localhost:11434"
             mock_settings.ollama_model = "qwen3:14b"
+            mock_settings.llm_max_concurrency = 4
+            mock_settings.llm_max_retries = 2
 
             provider = get_llm_provider()
 
             assert provider is not None
+            assert provider.client.max_retries == 2
 
     def test_factory_returns_provider(self):
         """Test that factory returns a provider instance."""
@@ -38,6 +274,8 @@ class TestGetLLMProvider:
             mock_settings.llm_provider = "ollama"
             mock_settings.ollama_base_url = "http://localhost:11434"
             mock_settings.ollama_model = "qwen3:14b"
+            mock_settings.llm_max_concurrency = 4
+            mock_settings.llm_max_retries = 2
 
             provider = get_llm_provider()
 
@@ -59,14 +297,27 @@ class TestLLMDependencies:
 
             assert result == mock_provider
 
-    def test_llm_provider_dep_returns_input(self):
-        """Test that llm_provider_dep returns the input provider."""
+    def test_llm_provider_dep_returns_app_provider(self):
+        """Test that llm_provider_dep returns the app-wide provider."""
         mock_provider = MagicMock(spec=LLMProvider)
+        request = MagicMock()
+        request.app.state.llm_provider = mock_provider
 
-        result = llm_provider_dep(mock_provider)
+        result = llm_provider_dep(request)
 
         assert result == mock_provider
 
+    def test_llm_provider_dep_creates_missing_provider(self):
+        """Test the provider is created once when the lifespan didn't run."""
+        request = MagicMock()
+        request.app.state = MagicMock(spec=[])
+        with patch("app.services.llm.dependencies.get_llm_provider") as mock_factory:
+            first = llm_provider_dep(request)
+            second = llm_provider_dep(request)
+
+        assert first is second
+        mock_factory.assert_called_once_with()
+
 
 class TestCoverLetterGeneration:
     """Tests for cover letter generation logic."""
@@ -0,0 +1,94 @@
+"""Tests for data migrations."""
+
+import importlib.util
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.services.auto_reply_service import _message_hash
+
+VERSIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+def _load_migration(filename: str):
+    """Import a revision module; their names aren't valid identifiers."""
+    spec = importlib.util.spec_from_file_location(filename, VERSIONS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _upgrade(conn, filename: str) -> None:
+    """Run one revision's upgrade() against the connection."""
+    migration = _load_migration(filename)
+    with Operations.context(MigrationContext.configure(conn)):
+        migration.upgrade()
+
+
+class TestAutoReplyMessageHashMigration:
+    """Tests for the 0004 employer message hash backfill."""
+
+    def test_backfill_marks_later_duplicates(self, caplog):
+        """Test the first reply keeps the hash and duplicates are kept, marked."""
+        engine = sa.create_engine("sqlite://")
+        with engine.begin() as conn:
+            for filename in (
+                "0001_initial_tables.py",
+                "0002_scheduler_tables.py",
+                "0003_auto_reply_tables.py",
+            ):
+                _upgrade(conn, filename)
+
+            history = sa.table(
+                "auto_reply_history",
+                sa.column("id", sa.Integer()),
+                sa.column("user_id", sa.String()),
+                sa.column("negotiation_id", sa.String()),
+                sa.column("employer_message", sa.Text()),
+                sa.column("generated_reply", sa.Text()),
+                sa.column("was_sent", sa.Boolean()),
+                sa.column("created_at", sa.DateTime()),
+            )
+            replies = [
+                (1, "neg_1", "first"),
+                (2, "neg_1", "duplicate"),
+                (3, "neg_2", "other"),
+                (4, "neg_2", "duplicate"),
+            ]
+            conn.execute(
+                history.insert(),
+                [
+                    {
+                        "id": row_id,
+                        "user_id": "user_001",
+                        "negotiation_id": negotiation_id,
+                        "employer_message": "Hi",
+                        "generated_reply": reply,
+                        "was_sent": True,
+                        "created_at": datetime(2026, 1, 1),
+                    }
+                    for row_id, negotiation_id, reply in replies
+                ],
+            )
+
+            with caplog.at_level(logging.WARNING):
+                _upgrade(conn, "0004_auto_reply_message_hash.py")
+
+            rows = conn.execute(
+                sa.text(
+                    "SELECT id, generated_reply, employer_message_hash "
+                    "FROM auto_reply_history ORDER BY id"
+                )
+            ).all()
+
+        assert rows == [
+            (1, "first", _message_hash("Hi")),
+            (2, "duplicate", "dup:2"),
+            (3, "other", _message_hash("Hi")),
+            (4, "duplicate", "dup:4"),
+        ]
+        assert "Marked 2 duplicate" in caplog.text
@@ -0,0 +1,67 @@
+"""Tests for SchedulerService helpers."""
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.models.scheduler import SchedulerSettings
+from app.services.scheduler_service import (
+    SchedulerService,
+    _build_trigger,
+    _parse_schedule_days,
+)
+
+
+class TestScheduleDays:
+    """Tests for schedule day parsing and trigger construction."""
+
+    def test_parse_schedule_days(self):
+        """Test day names are normalized and unknown entries dropped."""
+        assert _parse_schedule_days("Mon, wed ,FRI,xyz") == (0, 2, 4)
+        assert _parse_schedule_days("") == ()
+
+    def test_build_trigger_reused_for_same_schedule(self):
+        """Test identical schedules share one trigger instance."""
+        trigger = _build_trigger("mon,fri", 9, 30, "Europe/Moscow")
+
+        assert trigger is _build_trigger("mon,fri", 9, 30, "Europe/Moscow")
+        assert trigger is not _build_trigger("mon,fri", 10, 30, "Europe/Moscow")
+
+    def test_build_trigger_defaults_to_weekdays(self):
+        """Test a schedule with no valid days falls back to weekdays."""
+        trigger = _build_trigger("", 9, 0, "UTC")
+        day_of_week = next(f for f in trigger.fields if f.name == "day_of_week")
+
+        assert str(day_of_week) == "0,1,2,3,4"
+
+
+class TestScheduleUserJob:
+    """Tests for scheduling and unscheduling a user's job."""
+
+    async def test_reschedule_replaces_and_disable_removes(self):
+        """Test rescheduling swaps the job in place and disabling drops it."""
+        service = SchedulerService()
+        previous = service._scheduler
+        service._scheduler = AsyncIOScheduler(timezone="UTC")
+        service._scheduler.start(paused=True)
+        user_settings = SchedulerSettings(
+            user_id="user_001",
+            enabled=True,
+            schedule_hour=9,
+            schedule_minute=0,
+            schedule_days="mon,tue,wed,thu,fri",
+            timezone="UTC",
+        )
+        try:
+            await service._schedule_user_job(user_settings)
+            user_settings.schedule_hour = 10
+            await service._schedule_user_job(user_settings)
+
+            jobs = service._scheduler.get_jobs()
+            assert [job.id for job in jobs] == ["auto_apply_user_001"]
+            assert jobs[0].next_run_time.hour == 10
+
+            user_settings.enabled = False
+            await service._schedule_user_job(user_settings)
+            assert service._scheduler.get_jobs() == []
+        finally:
+            service._scheduler.shutdown(wait=False)
+            service._scheduler = previous